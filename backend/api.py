@@ -3,49 +3,178 @@ Backend API for Empathetic Conversational Support System
 FastAPI-based REST API for chat interactions
 """
 
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Depends, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List, Dict, Any
+from functools import partial, lru_cache
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+import asyncio
 import sys
 import os
-import json
+import re
+import anyio
+import csv
+import io
+import orjson
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from personas.base_persona import FriendPersona
+from personas.base_persona import BasePersona, FriendPersona
 from personas.counselor_persona import CounselorPersona
 from personas.doctor_persona import DoctorPersona
 from privacy.privacy_manager import SessionManager, DifferentialPrivacy, DataAnonymizer
 from utils.text_preprocessor import TextPreprocessor
+from utils.storage import HistoryIndex, QuestionnaireStore
+from backend.integration import IntegrationManager
 import pickle
 from datetime import datetime
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start-up and shut-down work (the helpers are defined further down)
+    
+    Nothing slow runs at import. The classifier loads in the background so
+    the server answers right away (rule-based intents, /health reporting
+    "ready": false) until the model is in place.
+    """
+    global integration_manager
+    integration_manager = IntegrationManager(log_path=INTEGRATION_LOG_FILE)
+    integration_manager.start_log_flusher()
+    await index_existing_histories()
+    build_status_bodies()
+    loader = asyncio.create_task(start_intent_classifier())
+    try:
+        yield
+    finally:
+        if not loader.done():
+            loader.cancel()
+        await stop_intent_batcher()
+        await integration_manager.aclose()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Empathetic Conversational Support System API",
     description="Privacy-preserving mental health support chatbot",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Chat history storage
 CHAT_HISTORY_DIR = "chat_history"
 os.makedirs(CHAT_HISTORY_DIR, exist_ok=True)
+history_index = HistoryIndex(os.path.join(CHAT_HISTORY_DIR, "history_index.db"))
 
 # Questionnaire results storage
 QUESTIONNAIRE_RESULTS_DIR = "questionnaire_results"
 os.makedirs(QUESTIONNAIRE_RESULTS_DIR, exist_ok=True)
+questionnaire_store = QuestionnaireStore(os.path.join(QUESTIONNAIRE_RESULTS_DIR, "questionnaire_results.db"))
+
+# Integration events (appended by IntegrationManager's background flush)
+INTEGRATION_LOG_DIR = "logs"
+os.makedirs(INTEGRATION_LOG_DIR, exist_ok=True)
+INTEGRATION_LOG_FILE = os.path.join(INTEGRATION_LOG_DIR, "integration_events.jsonl")
+
+# CORS: a bare ASGI middleware (instead of Starlette's CORSMiddleware, which
+# normalizes headers on every request) checks the caller's origin against a
+# set of allowed origins and answers preflights directly. CORS_ORIGINS is a
+# comma-separated list; "*" allows every origin.
+CORS_ORIGINS = [origin.strip() for origin in os.getenv(
+    "CORS_ORIGINS", "http://localhost:8501,http://localhost:3000").split(",") if origin.strip()]
+CORS_ALLOW_ALL = "*" in CORS_ORIGINS
+CORS_ALLOWED_ORIGINS = frozenset(origin.encode("latin-1") for origin in CORS_ORIGINS)
+CORS_ALLOW_METHODS = b"DELETE, GET, POST"
+CORS_ALLOW_HEADERS = b"Content-Type"
+CORS_MAX_AGE = b"600"
+
+
+class CORSHeaderMiddleware:
+    """Adds CORS headers to requests from allowed origins"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        origin = None
+        is_preflight = False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                is_preflight = scope["method"] == "OPTIONS"
+        
+        # Same-origin and non-browser clients need no CORS headers, and
+        # disallowed origins get none so the browser blocks the response
+        if origin is None or not (CORS_ALLOW_ALL or origin in CORS_ALLOWED_ORIGINS):
+            await self.app(scope, receive, send)
+            return
+        
+        cors_headers = [
+            (b"access-control-allow-origin", origin),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+        
+        if is_preflight:
+            cors_headers += [
+                (b"access-control-allow-methods", CORS_ALLOW_METHODS),
+                (b"access-control-allow-headers", CORS_ALLOW_HEADERS),
+                (b"access-control-max-age", CORS_MAX_AGE),
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", b"2"),
+            ]
+            await send({"type": "http.response.start", "status": 200, "headers": cors_headers})
+            await send({"type": "http.response.body", "body": b"OK"})
+            return
+        
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + cors_headers
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cors)
+
+
+# Gzip responses of at least GZIP_MINIMUM_SIZE bytes (histories, exports,
+# statistics) for clients that accept it. Streaming endpoints are skipped:
+# the compressor would hold chunks back until enough output accumulates.
+GZIP_MINIMUM_SIZE = 1024
+UNCOMPRESSED_PATHS = frozenset({"/chat/stream"})
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+
+class SelectiveGZipMiddleware:
+    """GZipMiddleware for every path except UNCOMPRESSED_PATHS"""
+    
+    def __init__(self, app, minimum_size: int = GZIP_MINIMUM_SIZE):
+        self.app = app
+        self.gzip_app = GZipMiddleware(app, minimum_size=minimum_size)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] not in UNCOMPRESSED_PATHS:
+            await self.gzip_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+app.add_middleware(SelectiveGZipMiddleware)
+app.add_middleware(CORSHeaderMiddleware)
+
+# Worker threads allowed to run model/NLP work at once, so concurrent
+# requests don't oversubscribe the CPU. anyio 3 can only create the limiter
+# inside a running event loop, so it is created on first use.
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", str(os.cpu_count() or 4)))
+inference_limiter = None
 
 # Global instances
 personas = {
@@ -59,44 +188,89 @@ dp_mechanism = DifferentialPrivacy(epsilon=1.0)
 anonymizer = DataAnonymizer()
 preprocessor = TextPreprocessor()
 
-# Try to load intent classifier (using fine-tuned model)
-try:
+# The intent classifier is loaded by the startup handler rather than at import,
+# so importing this module stays cheap and workers come up quickly
+intent_classifier = None
+intent_batcher = None
+intent_predict_batch = None  # blocking texts -> [(intent, confidence)]
+intent_model_info = None
+inference_pool = None
+CLASSIFIER_LOADED = False
+CLASSIFIER_READY = False  # load attempt finished, with the model or the fallback
+
+
+# Dynamic INT8 quantization of the classifier on CPU (set to 0 to keep FP32)
+QUANTIZE_INTENT_MODEL = os.getenv("QUANTIZE_INTENT_MODEL", "1") == "1"
+
+# Worker processes that each hold a copy of the classifier, so batches run in
+# parallel outside this process's GIL. 0 runs the model in worker threads.
+INFERENCE_PROCESSES = int(os.getenv("INFERENCE_PROCESSES", "0"))
+
+# Try improved fine-tuned model first, fallback to original
+INTENT_MODEL_DIRS = ["models/finetuned_intent_classifier_v2", "models/trained_intent_classifier"]
+
+
+def load_intent_classifier():
+    """Load and warm the fine-tuned intent classifier (blocking)"""
     from models.intent_classifier import IntentClassificationEngine
-    intent_classifier = IntentClassificationEngine()
-    # Try improved fine-tuned model first, fallback to original
+    engine = IntentClassificationEngine()
     try:
-        intent_classifier.load_model("models/finetuned_intent_classifier_v2")
+        engine.load_model(INTENT_MODEL_DIRS[0])
         print("✓ Loaded improved fine-tuned model (v2)")
     except:
-        intent_classifier.load_model("models/trained_intent_classifier")
+        engine.load_model(INTENT_MODEL_DIRS[1])
         print("✓ Loaded original trained model")
-    CLASSIFIER_LOADED = True
-except Exception as e:
-    print(f"Warning: Could not load intent classifier: {e}")
-    print("Using rule-based intent detection as fallback")
-    CLASSIFIER_LOADED = False
+    engine.optimize_for_inference(quantize=QUANTIZE_INTENT_MODEL)
+    return engine
+
+
+async def start_inference_pool():
+    """Start the classifier worker processes and return the model's info"""
+    global inference_pool
+    from concurrent.futures import ProcessPoolExecutor
+    from models.intent_classifier import init_inference_worker, worker_model_info
+    
+    num_threads = max(1, (os.cpu_count() or 1) // INFERENCE_PROCESSES)
+    inference_pool = ProcessPoolExecutor(
+        max_workers=INFERENCE_PROCESSES,
+        initializer=init_inference_worker,
+        initargs=(INTENT_MODEL_DIRS, QUANTIZE_INTENT_MODEL, num_threads)
+    )
+    return await asyncio.wrap_future(inference_pool.submit(worker_model_info))
+
+
+def predict_batch_in_pool(texts: List[str]) -> List[tuple]:
+    """Run a batch on one of the classifier worker processes (blocking)"""
+    from models.intent_classifier import worker_predict_batch
+    return inference_pool.submit(worker_predict_batch, texts).result()
 
 
 # Load response database
 try:
-    with open("models/response_database.json", 'r', encoding='utf-8') as f:
-        response_database = json.load(f)
+    with open("models/response_database.json", 'rb') as f:
+        response_database = orjson.loads(f.read())
 except:
     response_database = {}
 
 
 # Pydantic models
 class SessionCreate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     user_id: Optional[str] = None
 
 
 class ChatMessage(BaseModel):
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+    
     session_id: str
     message: str
     persona: str = "friend"  # friend, counselor, or medical_officer
 
 
 class ChatResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     session_id: str
     user_message: str
     bot_response: str
@@ -107,6 +281,8 @@ class ChatResponse(BaseModel):
 
 
 class SessionInfo(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     session_id: str
     created_at: str
     message_count: int
@@ -114,11 +290,15 @@ class SessionInfo(BaseModel):
 
 
 class QuestionnaireAnswers(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     session_id: str
     answers: Dict[str, Any]
 
 
 class QuestionnaireResult(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     session_id: str
     total_score: float
     category: str
@@ -128,42 +308,302 @@ class QuestionnaireResult(BaseModel):
     timestamp: str
 
 
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call in the worker thread pool without stalling the event loop"""
+    global inference_limiter
+    if inference_limiter is None:
+        inference_limiter = anyio.CapacityLimiter(INFERENCE_THREADS)
+    return await anyio.to_thread.run_sync(
+        partial(func, *args, **kwargs), limiter=inference_limiter
+    )
+
+
+async def run_io(func, *args, **kwargs):
+    """Run blocking file I/O in a thread, outside the inference limiter"""
+    return await anyio.to_thread.run_sync(partial(func, *args, **kwargs))
+
+
 # Fallback intent detection
+FALLBACK_INTENT_KEYWORDS = {
+    'greeting': ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening'],
+    'goodbye': ['bye', 'goodbye', 'see you', 'gotta go'],
+    'thanks': ['thank', 'thanks', 'appreciate'],
+    'sad': ['sad', 'down', 'unhappy', 'depressed feeling'],
+    'depressed': ['depressed', 'depression', 'hopeless'],
+    'anxious': ['anxious', 'anxiety', 'worried', 'nervous', 'panic'],
+    'stressed': ['stressed', 'stress', 'overwhelmed', 'pressure'],
+    'happy': ['happy', 'great', 'good', 'wonderful', 'excellent'],
+    'help': ['help', 'support', 'assist'],
+    'suicide': ['suicide', 'kill myself', 'end my life']
+}
+
+# Intents are listed in priority order; the earliest intent with any
+# keyword in the text wins
+FALLBACK_INTENT_NAMES = list(FALLBACK_INTENT_KEYWORDS)
+FALLBACK_INTENT_PRIORITY = {intent: rank for rank, intent in enumerate(FALLBACK_INTENT_NAMES)}
+
+# One alternation with a named group per intent, wrapped in a lookahead so
+# a single scan reports a match at every position (overlapping keywords
+# can't hide a higher-priority intent)
+FALLBACK_INTENT_PATTERN = re.compile(
+    "(?=" + "|".join(
+        f"(?P<{intent}>{'|'.join(map(re.escape, keywords))})"
+        for intent, keywords in FALLBACK_INTENT_KEYWORDS.items()
+    ) + ")"
+)
+
+
 def detect_intent_fallback(text: str) -> tuple:
     """Simple rule-based intent detection"""
-    text_lower = text.lower()
-    
-    # Define keyword mappings
-    intent_keywords = {
-        'greeting': ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening'],
-        'goodbye': ['bye', 'goodbye', 'see you', 'gotta go'],
-        'thanks': ['thank', 'thanks', 'appreciate'],
-        'sad': ['sad', 'down', 'unhappy', 'depressed feeling'],
-        'depressed': ['depressed', 'depression', 'hopeless'],
-        'anxious': ['anxious', 'anxiety', 'worried', 'nervous', 'panic'],
-        'stressed': ['stressed', 'stress', 'overwhelmed', 'pressure'],
-        'happy': ['happy', 'great', 'good', 'wonderful', 'excellent'],
-        'help': ['help', 'support', 'assist'],
-        'suicide': ['suicide', 'kill myself', 'end my life']
-    }
+    best_rank = None
+    for match in FALLBACK_INTENT_PATTERN.finditer(text.lower()):
+        rank = FALLBACK_INTENT_PRIORITY[match.lastgroup]
+        if best_rank is None or rank < best_rank:
+            best_rank = rank
+            if rank == 0:
+                # Nothing can outrank the first intent; stop scanning
+                break
     
-    for intent, keywords in intent_keywords.items():
-        if any(keyword in text_lower for keyword in keywords):
-            return intent, 0.75
+    if best_rank is not None:
+        return FALLBACK_INTENT_NAMES[best_rank], 0.75
     
     return 'casual', 0.5
 
 
-# API Endpoints
-@app.get("/")
-async def root():
-    """Root endpoint"""
-    return {
+class IntentBatcher:
+    """
+    Coalesces concurrent intent predictions into batched forward passes
+    
+    Callers queue (text, future) pairs; a background task drains up to
+    max_batch items, waiting at most max_wait seconds for more to arrive,
+    runs one predict_batch call in the worker pool and resolves every future.
+    Up to max_in_flight batches run at once (more than one only pays off when
+    predict_batch runs outside this process).
+    """
+    
+    def __init__(self, predict_batch, max_batch: int = 16, max_wait: float = 0.005,
+                 max_in_flight: int = 1):
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_in_flight = max_in_flight
+        self.queue = None
+        self.slots = None
+        self.worker = None
+        self.in_flight = set()
+    
+    def start(self):
+        """Start the background worker on the running event loop"""
+        self.queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(self.max_in_flight)
+        self.worker = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Cancel the background worker"""
+        if self.worker:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+    
+    async def predict(self, text: str) -> tuple:
+        """Queue a text and wait for its (intent, confidence)"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        return await future
+    
+    async def _collect(self) -> list:
+        """Wait for one item, then gather more until the batch fills or max_wait passes"""
+        loop = asyncio.get_running_loop()
+        items = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        
+        while len(items) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        return items
+    
+    async def _run(self):
+        while True:
+            # Collect only once a slot is free, so batches keep filling while
+            # earlier ones are still running
+            await self.slots.acquire()
+            items = await self._collect()
+            task = asyncio.create_task(self._dispatch(items))
+            self.in_flight.add(task)
+            task.add_done_callback(self.in_flight.discard)
+    
+    async def _dispatch(self, items: list):
+        try:
+            results = await run_blocking(self.predict_batch, [text for text, _ in items])
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.slots.release()
+        
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+
+# Intent, crisis and emotion detection are deterministic on their input, so
+# repeated messages ("hi", "thanks", ...) are served from memory. The intent
+# cache is only touched from the event loop, so it needs no locking. Its keys
+# are exactly the text the model saw, so /chat and /model/predict share it.
+INTENT_CACHE_SIZE = int(os.getenv("INTENT_CACHE_SIZE", "10000"))
+_intent_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _get_cached_intent(text: str) -> Optional[tuple]:
+    cached = _intent_cache.get(text)
+    if cached is not None:
+        _intent_cache.move_to_end(text)
+    return cached
+
+
+def _cache_intent(text: str, result: tuple):
+    _intent_cache[text] = result
+    if len(_intent_cache) > INTENT_CACHE_SIZE:
+        _intent_cache.popitem(last=False)
+
+
+def normalize_model_input(text: str) -> str:
+    """Lowercase and collapse whitespace, which the uncased tokenizer ignores anyway"""
+    return " ".join(text.lower().split())
+
+
+async def _predict_intent_fallback(text_lower: str) -> tuple:
+    return detect_intent_fallback(text_lower)
+
+
+# Intent predictor for cache misses; rebound to the batcher once the
+# classifier has loaded, so requests don't branch on CLASSIFIER_LOADED
+intent_predictor = _predict_intent_fallback
+
+
+async def classify_intent(text_lower: str) -> tuple:
+    """Classify normalized text with the trained model (batched) or the fallback rules"""
+    cached = _get_cached_intent(text_lower)
+    if cached is not None:
+        return cached
+    
+    result = await intent_predictor(text_lower)
+    _cache_intent(text_lower, result)
+    return result
+
+
+@lru_cache(maxsize=2048)
+def _cached_crisis(persona_name: str, text: str) -> bool:
+    """Crisis check for a persona"""
+    return personas[persona_name].detect_crisis(text)
+
+
+@lru_cache(maxsize=2048)
+def _cached_emotions(text: str) -> Dict[str, List[str]]:
+    """Emotion keywords found in text (treat the result as read-only)"""
+    return preprocessor.detect_emotion_keywords(text)
+
+
+async def start_intent_classifier():
+    """Load the classifier off the event loop and start batching predictions"""
+    global intent_classifier, intent_batcher, intent_predictor, intent_predict_batch
+    global intent_model_info, CLASSIFIER_LOADED, CLASSIFIER_READY
+    try:
+        if INFERENCE_PROCESSES > 0:
+            intent_model_info = await start_inference_pool()
+            intent_predict_batch = predict_batch_in_pool
+            print(f"✓ Intent classifier running in {INFERENCE_PROCESSES} worker processes")
+        else:
+            intent_classifier = await anyio.to_thread.run_sync(load_intent_classifier)
+            intent_model_info = intent_classifier.get_model_info()
+            intent_predict_batch = intent_classifier.predict_batch
+        CLASSIFIER_LOADED = True
+    except Exception as e:
+        print(f"Warning: Could not load intent classifier: {e}")
+        print("Using rule-based intent detection as fallback")
+        if inference_pool:
+            inference_pool.shutdown(wait=False, cancel_futures=True)
+        CLASSIFIER_READY = True
+        return
+    
+    intent_batcher = IntentBatcher(intent_predict_batch, max_in_flight=max(1, INFERENCE_PROCESSES))
+    intent_batcher.start()
+    intent_predictor = intent_batcher.predict
+    # Drop rule-based results cached while the model was loading
+    _intent_cache.clear()
+    build_status_bodies()
+    CLASSIFIER_READY = True
+
+
+async def index_existing_histories():
+    """Index history files written before the index existed"""
+    try:
+        await run_io(index_saved_histories)
+    except Exception as e:
+        print(f"Warning: Could not index saved chat histories: {e}")
+
+
+async def stop_intent_batcher():
+    if intent_batcher:
+        await intent_batcher.stop()
+    if inference_pool:
+        inference_pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Static payloads, serialized once: the persona list is fixed at import, and
+# the root status and model info only change when the classifier finishes loading
+PERSONAS_BODY = orjson.dumps({
+    "personas": [
+        {
+            "name": name,
+            "description": persona.description,
+            "style": persona.get_persona_style()
+        }
+        for name, persona in personas.items()
+    ]
+})
+STATIC_HEADERS = {"cache-control": "public, max-age=3600"}
+root_body = b""
+model_info_body = b""
+
+
+def build_status_bodies():
+    """Serialize the root status and model info for the current classifier state"""
+    global root_body, model_info_body
+    root_body = orjson.dumps({
         "message": "Empathetic Conversational Support System API",
         "version": "1.0.0",
         "status": "running",
         "classifier_loaded": CLASSIFIER_LOADED
-    }
+    })
+    
+    if CLASSIFIER_LOADED:
+        model_info_body = orjson.dumps({
+            "model_loaded": CLASSIFIER_LOADED,
+            "model_name": intent_model_info['model_name'],
+            "max_length": intent_model_info['max_length'],
+            "device": intent_model_info['device'],
+            "num_classes": len(intent_model_info['intents']),
+            "intents": intent_model_info['intents']
+        })
+
+
+# API Endpoints
+@app.get("/")
+async def root():
+    """Root endpoint"""
+    return Response(content=root_body, media_type="application/json")
 
 
 @app.post("/session/create", response_model=Dict)
@@ -171,107 +611,262 @@ async def create_session(session_create: SessionCreate):
     """Create a new chat session"""
     try:
         session_id = session_manager.create_session(session_create.user_id)
-        return {
+        return ORJSONResponse(content={
             "session_id": session_id,
             "message": "Session created successfully"
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat(chat_message: ChatMessage):
-    """Process a chat message"""
-    
-    # Validate session
+def validate_chat_request(chat_message: ChatMessage) -> Dict:
+    """Return the message's session, or raise 404/400 for an unknown session or persona"""
     session = session_manager.get_session(chat_message.session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Validate persona
     if chat_message.persona not in personas:
         raise HTTPException(status_code=400, detail="Invalid persona")
     
+    return session
+
+
+# Intent reported for messages the crisis check flags
+CRISIS_INTENT = 'suicide'
+
+
+async def analyze_message(chat_message: ChatMessage) -> tuple:
+    """Run PII, preprocessing, emotion, crisis and intent checks on a message"""
+    # These checks are independent, so run them concurrently in the worker pool
+    pii_detected, processed_message, emotions, crisis_detected = await asyncio.gather(
+        run_blocking(anonymizer.detect_pii, chat_message.message),
+        run_blocking(preprocessor.clean_text, chat_message.message),
+        run_blocking(_cached_emotions, chat_message.message),
+        run_blocking(_cached_crisis, chat_message.persona, chat_message.message)
+    )
+    if pii_detected:
+        print(f"Warning: PII detected in message: {pii_detected}")
+    
+    # Personas answer a crisis with their fixed crisis response whatever the
+    # intent, so skip the classifier for these messages
+    if crisis_detected:
+        return emotions, crisis_detected, CRISIS_INTENT, 1.0
+    
+    # Detect intent (clean_text already lowercases the message)
+    intent, confidence = await classify_intent(processed_message)
+    
+    return emotions, crisis_detected, intent, confidence
+
+
+def snapshot_session(session_id: str, session_data: Dict) -> bytes:
+    """Serialize a session's conversation as a pretty-printed JSON snapshot"""
+    return orjson.dumps({
+        "session_id": session_id,
+        "messages": list(session_data.get('conversation_history', [])),
+        "created_at": session_data.get('created_at', datetime.now().isoformat()),
+        "last_updated": datetime.now().isoformat()
+    }, option=orjson.OPT_INDENT_2)
+
+
+def write_session_history(session_id: str, session_data: Dict) -> str:
+    """Write a session's JSON snapshot to the chat history directory (blocking)"""
+    history_file = os.path.join(CHAT_HISTORY_DIR, f"{session_id}.json")
+    with open(history_file, 'wb') as f:
+        f.write(snapshot_session(session_id, session_data))
+    return history_file
+
+
+def append_history_entry(session_id: str, created_at: str, entry: Dict):
+    """
+    Append one message to the session's JSONL history log (blocking)
+    
+    The log starts with a header line holding the session id and creation
+    time; every following line is one message entry. Appending keeps the
+    per-message cost constant instead of rewriting the whole history.
+    """
+    log_file = os.path.join(CHAT_HISTORY_DIR, f"{session_id}.jsonl")
+    with open(log_file, 'ab') as f:
+        if f.tell() == 0:
+            f.write(orjson.dumps({"session_id": session_id, "created_at": created_at}) + b"\n")
+        f.write(orjson.dumps(entry) + b"\n")
+    
+    history_index.record_message(session_id, created_at, entry['timestamp'])
+
+
+async def autosave_session_history(session_id: str, session_data: Dict, entry: Dict):
+    """Log a new message off the event loop, logging rather than raising on failure"""
+    try:
+        await run_io(append_history_entry, session_id, session_data['created_at'], entry)
+    except Exception as save_error:
+        print(f"Warning: Failed to auto-save chat history: {save_error}")
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(chat_message: ChatMessage):
+    """Process a chat message"""
+    session = validate_chat_request(chat_message)
+    
     try:
         # Get persona
         persona = personas[chat_message.persona]
         
-        # Detect PII
-        pii_detected = anonymizer.detect_pii(chat_message.message)
-        if pii_detected:
-            print(f"Warning: PII detected in message: {pii_detected}")
-        
-        # Preprocess message
-        processed_message = preprocessor.clean_text(chat_message.message)
+        emotions, crisis_detected, intent, confidence = await analyze_message(chat_message)
         
-        # Detect intent
-        if CLASSIFIER_LOADED:
-            intent, confidence = intent_classifier.predict(
-                processed_message, return_confidence=True
-            )
-        else:
-            intent, confidence = detect_intent_fallback(processed_message)
-        
-        # Check for crisis
-        crisis_detected = persona.detect_crisis(chat_message.message)
-        
-        # Detect emotions
-        emotions = preprocessor.detect_emotion_keywords(chat_message.message)
-        
-        # Generate response
-        context = {
-            'emotions': emotions,
-            'session_history': session['conversation_history'][-5:]  # Last 5 messages
-        }
-        
-        bot_response = persona.generate_response(
-            chat_message.message,
-            intent,
-            confidence,
-            context
-        )
-        
-        # Add to session
-        session_manager.add_message(
-            chat_message.session_id,
-            chat_message.message,
-            bot_response,
-            metadata={
-                'persona': chat_message.persona,
-                'intent': intent,
-                'confidence': confidence,
-                'crisis_detected': crisis_detected
+        # Reading context, generating and appending must not interleave with
+        # another request on the same session; other sessions are unaffected
+        async with session['lock']:
+            # Generate response
+            context = {
+                'emotions': emotions,
+                'session_history': session_manager.get_recent_history(chat_message.session_id, 5)
             }
-        )
+            
+            bot_response = await run_blocking(
+                persona.generate_response,
+                chat_message.message,
+                intent,
+                confidence,
+                context
+            )
+            
+            # Add to session
+            entry = session_manager.add_message(
+                chat_message.session_id,
+                chat_message.message,
+                bot_response,
+                metadata={
+                    'persona': chat_message.persona,
+                    'intent': intent,
+                    'confidence': confidence,
+                    'crisis_detected': crisis_detected
+                }
+            )
+            
+            # Auto-save chat history (still under the lock, so saves of one
+            # session land in order)
+            await autosave_session_history(chat_message.session_id, session, entry)
         
-        # Auto-save chat history
-        try:
-            session_data = session_manager.get_session(chat_message.session_id)
-            history_file = os.path.join(CHAT_HISTORY_DIR, f"{chat_message.session_id}.json")
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    "session_id": chat_message.session_id,
-                    "messages": session_data.get('conversation_history', []),
-                    "created_at": session_data.get('created_at', datetime.now().isoformat()),
-                    "last_updated": datetime.now().isoformat()
-                }, f, indent=2)
-        except Exception as save_error:
-            print(f"Warning: Failed to auto-save chat history: {save_error}")
-        
-        return ChatResponse(
-            session_id=chat_message.session_id,
-            user_message=chat_message.message,
-            bot_response=bot_response,
-            persona=chat_message.persona,
-            intent=intent,
-            confidence=confidence,
-            crisis_detected=crisis_detected
-        )
+        # Every field comes from already-validated input or our own code, so
+        # serialize directly; returning a Response skips the response_model
+        # validation pass (the model still documents the endpoint)
+        return ORJSONResponse(content={
+            "session_id": chat_message.session_id,
+            "user_message": chat_message.message,
+            "bot_response": bot_response,
+            "persona": chat_message.persona,
+            "intent": intent,
+            "confidence": confidence,
+            "crisis_detected": crisis_detected
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def streams_incrementally(persona: BasePersona) -> bool:
+    """Whether a persona overrides generate_response_stream with its own generation"""
+    return type(persona).generate_response_stream is not BasePersona.generate_response_stream
+
+
+async def iter_response_chunks(persona: BasePersona, stream):
+    """
+    Yield a persona's reply chunks without blocking the event loop
+    
+    The default stream has the whole template reply after its first step,
+    so it is drained in one worker-pool call and then split on the loop;
+    only personas with real incremental generation pull each chunk in the
+    pool (one limiter slot per chunk).
+    """
+    if streams_incrementally(persona):
+        while True:
+            chunk = await run_blocking(next, stream, None)
+            if chunk is None:
+                return
+            yield chunk
+    else:
+        for chunk in await run_blocking(list, stream):
+            yield chunk
+
+
+@app.post("/chat/stream")
+async def chat_stream(chat_message: ChatMessage):
+    """
+    Process a chat message and stream the reply as Server-Sent Events
+    
+    Each event's data is a JSON object: {"chunk": "..."} for every piece of
+    the reply, then one final frame with the same fields as a /chat
+    response (session_id, bot_response, persona, intent, confidence,
+    crisis_detected) and "done": true. The reply (or whatever part of it was
+    sent) is added to the session history like a /chat reply. If generation
+    fails after the stream has started, the final frame is
+    {"done": true, "error": "..."} instead.
+    """
+    session = validate_chat_request(chat_message)
+    persona = personas[chat_message.persona]
+    
+    try:
+        emotions, crisis_detected, intent, confidence = await analyze_message(chat_message)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def event_stream():
+        async with session['lock']:
+            chunks = []
+            try:
+                context = {
+                    'emotions': emotions,
+                    'session_history': session_manager.get_recent_history(chat_message.session_id, 5)
+                }
+                stream = persona.generate_response_stream(
+                    chat_message.message, intent, confidence, context
+                )
+                
+                async for chunk in iter_response_chunks(persona, stream):
+                    chunks.append(chunk)
+                    yield b"data: " + orjson.dumps({"chunk": chunk}) + b"\n\n"
+                
+                yield b"data: " + orjson.dumps({
+                    "done": True,
+                    "session_id": chat_message.session_id,
+                    "user_message": chat_message.message,
+                    "bot_response": "".join(chunks),
+                    "persona": chat_message.persona,
+                    "intent": intent,
+                    "confidence": confidence,
+                    "crisis_detected": crisis_detected
+                }) + b"\n\n"
+            except Exception as e:
+                # Headers are already sent, so report the failure in-band
+                yield b"data: " + orjson.dumps({
+                    "done": True,
+                    "session_id": chat_message.session_id,
+                    "error": str(e)
+                }) + b"\n\n"
+            finally:
+                # Persist even if generation failed or the client went away
+                if chunks:
+                    entry = session_manager.add_message(
+                        chat_message.session_id,
+                        chat_message.message,
+                        "".join(chunks),
+                        metadata={
+                            'persona': chat_message.persona,
+                            'intent': intent,
+                            'confidence': confidence,
+                            'crisis_detected': crisis_detected
+                        }
+                    )
+                    # Shielded so a client disconnect doesn't cancel the save
+                    with anyio.CancelScope(shield=True):
+                        await autosave_session_history(chat_message.session_id, session, entry)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"cache-control": "no-cache", "x-accel-buffering": "no"}
+    )
+
+
 @app.get("/session/{session_id}", response_model=SessionInfo)
 async def get_session_info(session_id: str):
     """Get session information"""
@@ -280,17 +875,16 @@ async def get_session_info(session_id: str):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Get most used persona
-    personas_used = [msg['metadata'].get('persona', 'unknown') 
-                    for msg in session['conversation_history']]
-    most_used_persona = max(set(personas_used), key=personas_used.count) if personas_used else 'unknown'
+    # Get most used persona (from the running per-session tally)
+    persona_counts = session_manager.get_persona_counts(session_id)
+    most_used_persona = persona_counts.most_common(1)[0][0] if persona_counts else 'unknown'
     
-    return SessionInfo(
-        session_id=session_id,
-        created_at=session['created_at'],
-        message_count=len(session['conversation_history']),
-        persona_used=most_used_persona
-    )
+    return ORJSONResponse(content={
+        "session_id": session_id,
+        "created_at": session['created_at'],
+        "message_count": len(session['conversation_history']),
+        "persona_used": most_used_persona
+    })
 
 
 @app.get("/session/{session_id}/history")
@@ -301,7 +895,7 @@ async def get_session_history(session_id: str, limit: int = 50):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    history = session['conversation_history'][-limit:]
+    history = session_manager.get_recent_history(session_id, limit)
     return {"history": history}
 
 
@@ -309,6 +903,11 @@ async def get_session_history(session_id: str, limit: int = 50):
 async def delete_session(session_id: str):
     """Delete a session"""
     try:
+        session = session_manager.get_session(session_id)
+        if session and session['conversation_history']:
+            # Closing the session materializes its JSON snapshot
+            async with session['lock']:
+                await run_io(write_session_history, session_id, session)
         session_manager.delete_session(session_id)
         return {"message": "Session deleted successfully"}
     except Exception as e:
@@ -318,36 +917,98 @@ async def delete_session(session_id: str):
 @app.get("/personas")
 async def list_personas():
     """List available personas"""
+    return Response(content=PERSONAS_BODY, media_type="application/json",
+                    headers=STATIC_HEADERS)
+
+
+def read_json_file(path: str):
+    """Load a JSON file (blocking)"""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def read_history_log(path: str) -> Dict:
+    """Rebuild the saved-history document from a JSONL history log (blocking)"""
+    with open(path, 'rb') as f:
+        header = orjson.loads(f.readline())
+        messages = [orjson.loads(line) for line in f]
+    
     return {
-        "personas": [
-            {
-                "name": "friend",
-                "description": personas['friend'].description,
-                "style": personas['friend'].get_persona_style()
-            },
-            {
-                "name": "counselor",
-                "description": personas['counselor'].description,
-                "style": personas['counselor'].get_persona_style()
-            },
-            {
-                "name": "medical_officer",
-                "description": personas['medical_officer'].description,
-                "style": personas['medical_officer'].get_persona_style()
-            }
-        ]
+        "session_id": header["session_id"],
+        "messages": messages,
+        "created_at": header["created_at"],
+        "last_updated": messages[-1]["timestamp"] if messages else header["created_at"]
+    }
+
+
+def load_saved_history(session_id: str) -> Optional[Dict]:
+    """Load a session's saved history, preferring the live log over a snapshot (blocking)"""
+    log_file = os.path.join(CHAT_HISTORY_DIR, f"{session_id}.jsonl")
+    if os.path.exists(log_file):
+        return read_history_log(log_file)
+    
+    history_file = os.path.join(CHAT_HISTORY_DIR, f"{session_id}.json")
+    if os.path.exists(history_file):
+        return read_json_file(history_file)
+    
+    return None
+
+
+def summarize_history_log(path: str) -> Dict:
+    """Summarize a JSONL history log without parsing every message (blocking)"""
+    with open(path, 'rb') as f:
+        header = orjson.loads(f.readline())
+        message_count = 0
+        last_line = None
+        for line in f:
+            message_count += 1
+            last_line = line
+    
+    return {
+        "session_id": header["session_id"],
+        "message_count": message_count,
+        "created_at": header["created_at"],
+        "last_updated": orjson.loads(last_line)["timestamp"] if last_line else header["created_at"]
     }
 
 
+def index_saved_histories():
+    """Add saved histories missing from the history index, e.g. from older versions (blocking)"""
+    indexed = history_index.session_ids()
+    # scandir's is_file() uses the directory entry's type, so skipping the
+    # already-indexed sessions costs no per-file stat calls
+    with os.scandir(CHAT_HISTORY_DIR) as it:
+        entries = [entry for entry in it
+                   if entry.name.endswith(('.json', '.jsonl')) and entry.is_file()
+                   and entry.name.rsplit('.', 1)[0] not in indexed]
+    logged_sessions = {entry.name[:-len('.jsonl')] for entry in entries if entry.name.endswith('.jsonl')}
+    histories = []
+    
+    for entry in entries:
+        file_name, path = entry.name, entry.path
+        if file_name.endswith('.jsonl'):
+            histories.append(summarize_history_log(path))
+        elif file_name.endswith('.json') and file_name[:-len('.json')] not in logged_sessions:
+            # Snapshot without a log (saved before logs were kept)
+            data = read_json_file(path)
+            histories.append({
+                "session_id": data.get("session_id"),
+                "message_count": len(data.get("messages", [])),
+                "created_at": data.get("created_at"),
+                "last_updated": data.get("last_updated")
+            })
+    
+    if histories:
+        history_index.add_sessions(histories)
+
+
 @app.get("/history/{session_id}")
 async def get_chat_history(session_id: str):
     """Get chat history for a session"""
     try:
-        history_file = os.path.join(CHAT_HISTORY_DIR, f"{session_id}.json")
+        history = await run_io(load_saved_history, session_id)
         
-        if os.path.exists(history_file):
-            with open(history_file, 'r', encoding='utf-8') as f:
-                history = json.load(f)
+        if history is not None:
             return {"session_id": session_id, "history": history}
         else:
             raise HTTPException(status_code=404, detail="Chat history not found")
@@ -361,19 +1022,12 @@ async def get_chat_history(session_id: str):
 async def save_chat_history(session_id: str):
     """Manually save chat history for a session"""
     try:
-        if session_id not in session_manager.sessions:
+        session = session_manager.get_session(session_id)
+        if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        session_data = session_manager.sessions[session_id]
-        history_file = os.path.join(CHAT_HISTORY_DIR, f"{session_id}.json")
-        
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "session_id": session_id,
-                "messages": session_data.get('conversation_history', []),
-                "created_at": session_data.get('created_at', datetime.now().isoformat()),
-                "last_updated": datetime.now().isoformat()
-            }, f, indent=2)
+        async with session['lock']:
+            history_file = await run_io(write_session_history, session_id, session)
         
         return {"message": "Chat history saved successfully", "file": history_file}
     except HTTPException:
@@ -383,22 +1037,10 @@ async def save_chat_history(session_id: str):
 
 
 @app.get("/history")
-async def list_all_histories():
-    """List all saved chat histories"""
+async def list_all_histories(limit: int = Query(100, ge=1, le=1000)):
+    """List the most recently updated saved chat histories"""
     try:
-        history_files = [f for f in os.listdir(CHAT_HISTORY_DIR) if f.endswith('.json')]
-        histories = []
-        
-        for history_file in history_files:
-            with open(os.path.join(CHAT_HISTORY_DIR, history_file), 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                histories.append({
-                    "session_id": data.get("session_id"),
-                    "message_count": len(data.get("messages", [])),
-                    "created_at": data.get("created_at"),
-                    "last_updated": data.get("last_updated")
-                })
-        
+        histories = await run_io(history_index.list_sessions, limit)
         return {"histories": histories, "count": len(histories)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -406,11 +1048,15 @@ async def list_all_histories():
 
 # Model Endpoints
 class PredictRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     text: str
     return_confidence: bool = True
 
 
 class PredictResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     text: str
     intent: str
     confidence: float
@@ -423,22 +1069,34 @@ async def predict_intent(request: PredictRequest):
         raise HTTPException(status_code=503, detail="Model not loaded")
     
     try:
-        intent, confidence = intent_classifier.predict(request.text, return_confidence=True)
+        text = normalize_model_input(request.text)
+        result = _get_cached_intent(text)
+        if result is None:
+            # Coalesced with concurrent requests into one forward pass
+            result = await intent_batcher.predict(text)
+            _cache_intent(text, result)
+        intent, confidence = result
         
-        return {
+        return ORJSONResponse(content={
             "text": request.text,
             "intent": intent,
             "confidence": confidence
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 class BatchPredictRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     texts: List[str]
     return_confidence: bool = True
 
 
+# Largest number of texts sent through the model in one forward pass
+BATCH_PREDICT_CHUNK = 32
+
+
 @app.post("/model/predict/batch")
 async def batch_predict_intent(request: BatchPredictRequest):
     """Predict intents for multiple texts"""
@@ -446,14 +1104,28 @@ async def batch_predict_intent(request: BatchPredictRequest):
         raise HTTPException(status_code=503, detail="Model not loaded")
     
     try:
-        predictions = []
-        for text in request.texts:
-            intent, confidence = intent_classifier.predict(text, return_confidence=True)
-            predictions.append({
-                "text": text,
-                "intent": intent,
-                "confidence": confidence
-            })
+        normalized = [normalize_model_input(text) for text in request.texts]
+        results = {}
+        misses = []
+        for text in normalized:
+            if text in results:
+                continue
+            cached = _get_cached_intent(text)
+            if cached is None:
+                misses.append(text)
+            results[text] = cached
+        
+        # Only uncached texts reach the model, one forward pass per chunk
+        for start in range(0, len(misses), BATCH_PREDICT_CHUNK):
+            chunk = misses[start:start + BATCH_PREDICT_CHUNK]
+            for text, result in zip(chunk, await run_blocking(intent_predict_batch, chunk)):
+                results[text] = result
+                _cache_intent(text, result)
+        
+        predictions = [
+            {"text": text, "intent": results[key][0], "confidence": results[key][1]}
+            for text, key in zip(request.texts, normalized)
+        ]
         
         return {"predictions": predictions, "count": len(predictions)}
     except Exception as e:
@@ -466,17 +1138,49 @@ async def get_model_info():
     if not CLASSIFIER_LOADED:
         raise HTTPException(status_code=503, detail="Model not loaded")
     
-    return {
-        "model_loaded": CLASSIFIER_LOADED,
-        "model_name": intent_classifier.model_name,
-        "max_length": intent_classifier.max_length,
-        "device": str(intent_classifier.device),
-        "num_classes": len(intent_classifier.label_encoder.classes_) if intent_classifier.label_encoder else 0,
-        "intents": list(intent_classifier.label_encoder.classes_) if intent_classifier.label_encoder else []
-    }
+    return Response(content=model_info_body, media_type="application/json",
+                    headers=STATIC_HEADERS)
 
 
 # Questionnaire Endpoint
+# Questionnaire scoring tables
+WORK_ENVIRONMENT_SCORES = {
+    "High-pressure deadlines": 1,
+    "Collaborative team": 3,
+    "Independent focus": 2,
+    "Balanced routine": 4
+}
+
+SELFCARE_SCORES = {
+    "Daily": 4,
+    "A few times a week": 3,
+    "Rarely": 2,
+    "Never": 1
+}
+
+SUPPORT_SCORES = {
+    "Quick tips": 2,
+    "Long-term strategies": 3,
+    "Professional advice": 3,
+    "None right now": 1
+}
+
+
+def write_questionnaire_json(result_data: Dict, filepath: str):
+    """Save a questionnaire result as JSON (blocking)"""
+    with open(filepath, 'wb') as f:
+        f.write(orjson.dumps(result_data, option=orjson.OPT_INDENT_2))
+
+
+def export_questionnaire_csv() -> str:
+    """Render every stored questionnaire result as CSV, one row per submission (blocking)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(QuestionnaireStore.COLUMNS)
+    writer.writerows(questionnaire_store.all_rows())
+    return buffer.getvalue()
+
+
 @app.post("/questionnaire/submit", response_model=QuestionnaireResult)
 async def submit_questionnaire(questionnaire: QuestionnaireAnswers):
     """Submit behavioral assessment questionnaire and calculate scores"""
@@ -487,34 +1191,16 @@ async def submit_questionnaire(questionnaire: QuestionnaireAnswers):
         scores = {}
         
         # Q1: Work Environment (1-4 points)
-        work_env_scores = {
-            "High-pressure deadlines": 1,
-            "Collaborative team": 3,
-            "Independent focus": 2,
-            "Balanced routine": 4
-        }
-        scores['work_environment'] = work_env_scores.get(answers.get('work_environment'), 2)
+        scores['work_environment'] = float(WORK_ENVIRONMENT_SCORES.get(answers.get('work_environment'), 2))
         
         # Q2: Stress Management (1-10 direct score)
         scores['stress_management'] = float(answers.get('stress_management', 5))
         
         # Q3: Self-care Frequency (1-4 points)
-        selfcare_scores = {
-            "Daily": 4,
-            "A few times a week": 3,
-            "Rarely": 2,
-            "Never": 1
-        }
-        scores['selfcare_frequency'] = selfcare_scores.get(answers.get('selfcare_frequency'), 2)
+        scores['selfcare_frequency'] = float(SELFCARE_SCORES.get(answers.get('selfcare_frequency'), 2))
         
         # Q4: Support Interest (1-3 points)
-        support_scores = {
-            "Quick tips": 2,
-            "Long-term strategies": 3,
-            "Professional advice": 3,
-            "None right now": 1
-        }
-        scores['support_interest'] = support_scores.get(answers.get('support_interest'), 2)
+        scores['support_interest'] = float(SUPPORT_SCORES.get(answers.get('support_interest'), 2))
         
         # Q5: Energy Level (1-10 direct score)
         scores['energy_level'] = float(answers.get('energy_level', 5))
@@ -550,66 +1236,108 @@ async def submit_questionnaire(questionnaire: QuestionnaireAnswers):
             "interpretation": interpretation
         }
         
-        # Save as JSON
-        filename = f"{questionnaire.session_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        filepath = os.path.join(QUESTIONNAIRE_RESULTS_DIR, filename)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(result_data, f, indent=2)
-        
-        # Also save as CSV for easier analysis
-        csv_filename = f"{questionnaire.session_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        csv_filepath = os.path.join(QUESTIONNAIRE_RESULTS_DIR, csv_filename)
-        
-        import csv
-        with open(csv_filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Metric', 'Value/Score'])
-            writer.writerow(['Session ID', questionnaire.session_id])
-            writer.writerow(['Timestamp', timestamp])
-            writer.writerow(['Work Environment', answers.get('work_environment')])
-            writer.writerow(['Work Environment Score', scores['work_environment']])
-            writer.writerow(['Stress Management (1-10)', answers.get('stress_management')])
-            writer.writerow(['Stress Management Score', scores['stress_management']])
-            writer.writerow(['Self-care Frequency', answers.get('selfcare_frequency')])
-            writer.writerow(['Self-care Score', scores['selfcare_frequency']])
-            writer.writerow(['Support Interest', answers.get('support_interest')])
-            writer.writerow(['Support Score', scores['support_interest']])
-            writer.writerow(['Energy Level (1-10)', answers.get('energy_level')])
-            writer.writerow(['Energy Level Score', scores['energy_level']])
-            writer.writerow(['Total Score', total_score])
-            writer.writerow(['Category', category])
-            writer.writerow(['Interpretation', interpretation])
-        
-        return QuestionnaireResult(
-            session_id=questionnaire.session_id,
-            total_score=total_score,
-            category=category,
-            interpretation=interpretation,
-            individual_scores=scores,
-            file_path=filepath,
-            timestamp=timestamp
+        # Save as JSON, and as a row in the results store for analysis
+        # (see /questionnaire/export); the two are independent, so write
+        # them concurrently
+        filepath = os.path.join(
+            QUESTIONNAIRE_RESULTS_DIR,
+            f"{questionnaire.session_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         )
+        await asyncio.gather(
+            run_io(write_questionnaire_json, result_data, filepath),
+            run_io(questionnaire_store.add_result, result_data)
+        )
+        
+        # Built from our own computed values, so skip the response_model
+        # validation pass (the model still documents the endpoint)
+        return ORJSONResponse(content={
+            "session_id": questionnaire.session_id,
+            "total_score": total_score,
+            "category": category,
+            "interpretation": interpretation,
+            "individual_scores": scores,
+            "file_path": filepath,
+            "timestamp": timestamp
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/questionnaire/export")
+async def export_questionnaire_results():
+    """Download every questionnaire result as one CSV (one row per submission)"""
+    try:
+        content = await run_io(export_questionnaire_csv)
+        return Response(
+            content=content,
+            media_type="text/csv",
+            headers={"content-disposition": 'attachment; filename="questionnaire_results.csv"'}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Clients of other platform components (created in lifespan)
+integration_manager = None
+
+
+class EnhanceRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
+    text: str
+    profile: Optional[Dict[str, Any]] = None
+
+
+@app.post("/integrations/enhance")
+async def enhance_with_integrations(request: EnhanceRequest):
+    """
+    Gateway for IntegrationManager.enhance_batch: risk prediction (Component 2)
+    and peer suggestions (Component 4) for a conversation in one call
+    """
+    try:
+        return await integration_manager.enhance_conversation_with_integrations(
+            {}, request.text, request.profile
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def statistics_intent_domain() -> List[str]:
+    """Every intent a message can be recorded with (model labels and fallback rules)"""
+    model_intents = intent_model_info['intents'] if intent_model_info else []
+    return [*model_intents, *FALLBACK_INTENT_NAMES, 'casual', 'unknown']
+
+
 @app.get("/statistics")
 async def get_statistics():
     """Get aggregated statistics (with differential privacy)"""
     try:
-        stats = session_manager.export_aggregated_data(dp_mechanism)
-        return {"statistics": stats, "privacy": "differential privacy applied"}
+        stats = session_manager.export_aggregated_data(dp_mechanism, statistics_intent_domain())
+        return {
+            "statistics": stats,
+            "privacy": "differential privacy applied",
+            "epsilon": dp_mechanism.epsilon
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/admin/flush-cache")
+async def flush_cache():
+    """Clear memoized intent, crisis and emotion results (e.g. after a model reload)"""
+    _intent_cache.clear()
+    _cached_crisis.cache_clear()
+    _cached_emotions.cache_clear()
+    return {"message": "Caches cleared"}
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
+        "ready": CLASSIFIER_READY,
         "classifier_loaded": CLASSIFIER_LOADED,
         "personas_available": len(personas),
         "active_sessions": len(session_manager.sessions)
@@ -626,4 +1354,20 @@ if __name__ == "__main__":
     print("API Documentation: http://localhost:8000/docs")
     print("="*70 + "\n")
     
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    # Sessions and caches live in this process, so extra workers only help
+    # behind a load balancer with sticky sessions; default to one
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    
+    # uvloop has no Windows build; fall back to the stock asyncio loop there.
+    # Multiple workers need an import string so each process loads the app;
+    # it is package-qualified so it resolves from the project root (added
+    # to sys.path above) whatever launched this script.
+    uvicorn.run(
+        "backend.api:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        log_level=os.getenv("LOG_LEVEL", "info").lower()
+    )
@@ -3,10 +3,182 @@ Integration Interface
 API for communication with other Manō platform components
 """
 
-from typing import Dict, List, Optional, Any
-import json
-import requests
+from typing import Dict, List, Optional, Any, AsyncIterator, Hashable
+from collections import OrderedDict, deque
+import asyncio
+import random
+import time
+import httpx
+import orjson
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+
+# Timeouts in seconds for component calls (connect, and everything else)
+REQUEST_TIMEOUT = httpx.Timeout(10.0, connect=3.05)
+
+# Longest wait in seconds for the parallel calls of one enhancement
+ENHANCEMENT_TIMEOUT = 5
+
+# Integration events kept in memory, and how often (seconds, or once this
+# many are waiting) they are appended to the log file
+INTEGRATION_LOG_SIZE = 10_000
+LOG_FLUSH_INTERVAL = 5.0
+LOG_FLUSH_SIZE = 500
+
+
+# Retries for transient failures: connection errors, timeouts and these
+# statuses. Other responses (including 4xx) are returned as they are.
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+RETRY_JITTER = 0.5
+
+
+def retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """
+    Seconds to wait before retry number `attempt` (0-based)
+    
+    Exponential backoff with jitter, capped at RETRY_MAX_DELAY; a server's
+    Retry-After header is honoured when it asks for longer.
+    """
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) * (1 + random.uniform(0, RETRY_JITTER))
+    
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    if retry_after:
+        try:
+            requested = float(retry_after)
+        except ValueError:
+            try:
+                requested = (parsedate_to_datetime(retry_after) - datetime.now().astimezone()).total_seconds()
+            except (TypeError, ValueError):
+                requested = 0
+        delay = max(delay, min(RETRY_MAX_DELAY, requested))
+    
+    return delay
+
+
+async def request_with_retry(client: httpx.AsyncClient, method: str, url: str,
+                             max_retries: int = MAX_RETRIES, stream: bool = False,
+                             **kwargs) -> httpx.Response:
+    """
+    Send a request, retrying transient failures with backoff
+    
+    Args:
+        client: HTTP client to send with
+        method: HTTP method
+        url: Request URL
+        max_retries: Retries after the first attempt
+        stream: Return before reading the body (the caller must aclose() the
+            response)
+        **kwargs: Passed to client.build_request (a json= body is encoded
+            with orjson)
+    
+    Returns:
+        The first non-retryable response, or the last response once retries
+        run out (connection errors and timeouts on the last attempt raise)
+    """
+    if 'json' in kwargs:
+        # Aggregates may hold NumPy values
+        kwargs['content'] = orjson.dumps(kwargs.pop('json'), option=orjson.OPT_SERIALIZE_NUMPY)
+        kwargs['headers'] = {**kwargs.get('headers', {}), 'content-type': 'application/json'}
+    
+    for attempt in range(max_retries + 1):
+        try:
+            response = await client.send(client.build_request(method, url, **kwargs), stream=stream)
+        except httpx.TransportError:
+            if attempt == max_retries:
+                raise
+            await asyncio.sleep(retry_delay(attempt))
+            continue
+        
+        if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+            return response
+        await response.aclose()
+        await asyncio.sleep(retry_delay(attempt, response))
+
+
+class StreamReader:
+    """Async file-like view of a streamed response body, for ijson"""
+    
+    def __init__(self, response: httpx.Response):
+        self.chunks = response.aiter_bytes()
+        self.buffer = b""
+    
+    async def read(self, size: int = -1) -> bytes:
+        # Up to `size` bytes (ijson's parser buffer is that big); b"" marks
+        # the end of the body
+        if not self.buffer:
+            try:
+                self.buffer = await self.chunks.__anext__()
+            except StopAsyncIteration:
+                return b""
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+class ResponseCache:
+    """
+    LRU cache of component responses with a per-entry time to live
+    
+    Expired entries are kept (until evicted) so a failed refresh can fall
+    back to the last good value. Values are shared; treat them as read-only.
+    """
+    
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+    
+    def get(self, key: Hashable):
+        """Get a fresh cached value, or None"""
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+    
+    def get_stale(self, key: Hashable, default=None):
+        """Get the cached value even if it has expired, or default"""
+        entry = self.entries.get(key)
+        return entry[1] if entry is not None else default
+    
+    def set(self, key: Hashable, value, ttl: float):
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+    
+    def clear(self):
+        self.entries.clear()
+
+
+# Seconds before a cached read of slowly-changing component data is refetched
+PROFILES_TTL = 300
+SCENARIOS_TTL = 300
+COMMUNITY_RESOURCES_TTL = 120
+HEALTH_TTL = 5
+
+# Total seconds one health probe may take, retry included
+HEALTH_CHECK_BUDGET = 3
+
+# Shared by every interface; keys start with the component's base URL
+response_cache = ResponseCache(maxsize=256)
+
+
+def clear_cache():
+    """Drop every cached component response"""
+    response_cache.clear()
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create a pooled, keep-alive async HTTP client for component calls"""
+    return httpx.AsyncClient(
+        timeout=REQUEST_TIMEOUT,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
 
 
 class Component1Interface:
@@ -15,10 +187,24 @@ class Component1Interface:
     Receives synthetic mental health profiles and scenarios for training
     """
     
-    def __init__(self, component1_url: str = "http://localhost:8001"):
+    def __init__(self, component1_url: str = "http://localhost:8001",
+                 client: Optional[httpx.AsyncClient] = None):
         self.base_url = component1_url
+        # Endpoint URLs, built once
+        self.profiles_url = f"{component1_url}/synthetic/profiles"
+        self.scenarios_url = f"{component1_url}/synthetic/scenarios"
+        self.interventions_url = f"{component1_url}/interventions/simulate"
+        self.health_url = f"{component1_url}/health"
+        # Reused across calls so connections are kept alive
+        self.owns_client = client is None
+        self.client = client or create_http_client()
+    
+    async def aclose(self):
+        """Close the HTTP client if this interface created it"""
+        if self.owns_client:
+            await self.client.aclose()
     
-    def fetch_synthetic_profiles(self, count: int = 100) -> List[Dict]:
+    async def fetch_synthetic_profiles(self, count: int = 100) -> List[Dict]:
         """
         Fetch synthetic mental health profiles for training
         
@@ -28,18 +214,26 @@ class Component1Interface:
         Returns:
             List of synthetic profiles
         """
+        key = (self.profiles_url, count)
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            response = requests.get(
-                f"{self.base_url}/synthetic/profiles",
+            response = await request_with_retry(
+                self.client, "GET", self.profiles_url,
                 params={'count': count}
             )
             if response.status_code == 200:
-                return response.json()['profiles']
+                profiles = orjson.loads(response.content)['profiles']
+                response_cache.set(key, profiles, PROFILES_TTL)
+                return profiles
         except Exception as e:
             print(f"Error fetching synthetic profiles: {e}")
-        return []
+        # Serve the last good result, even if expired, rather than nothing
+        return response_cache.get_stale(key, [])
     
-    def fetch_conversation_scenarios(self, scenario_type: str = "all") -> List[Dict]:
+    async def fetch_conversation_scenarios(self, scenario_type: str = "all") -> List[Dict]:
         """
         Fetch synthetic conversation scenarios
         
@@ -49,18 +243,26 @@ class Component1Interface:
         Returns:
             List of conversation scenarios
         """
+        key = (self.scenarios_url, scenario_type)
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            response = requests.get(
-                f"{self.base_url}/synthetic/scenarios",
+            response = await request_with_retry(
+                self.client, "GET", self.scenarios_url,
                 params={'type': scenario_type}
             )
             if response.status_code == 200:
-                return response.json()['scenarios']
+                scenarios = orjson.loads(response.content)['scenarios']
+                response_cache.set(key, scenarios, SCENARIOS_TTL)
+                return scenarios
         except Exception as e:
             print(f"Error fetching scenarios: {e}")
-        return []
+        # Serve the last good result, even if expired, rather than nothing
+        return response_cache.get_stale(key, [])
     
-    def request_intervention_simulations(self, user_profile: Dict) -> Dict:
+    async def request_intervention_simulations(self, user_profile: Dict) -> Dict:
         """
         Request intervention simulations based on user profile
         
@@ -71,12 +273,12 @@ class Component1Interface:
             Intervention recommendations
         """
         try:
-            response = requests.post(
-                f"{self.base_url}/interventions/simulate",
+            response = await request_with_retry(
+                self.client, "POST", self.interventions_url,
                 json={'profile': user_profile}
             )
             if response.status_code == 200:
-                return response.json()
+                return orjson.loads(response.content)
         except Exception as e:
             print(f"Error requesting interventions: {e}")
         return {}
@@ -88,10 +290,24 @@ class Component2Interface:
     Shares interaction patterns and receives risk predictions
     """
     
-    def __init__(self, component2_url: str = "http://localhost:8002"):
+    def __init__(self, component2_url: str = "http://localhost:8002",
+                 client: Optional[httpx.AsyncClient] = None):
         self.base_url = component2_url
+        # Endpoint URLs, built once
+        self.patterns_url = f"{component2_url}/patterns/upload"
+        self.risk_url = f"{component2_url}/predict/risk"
+        self.alerts_url = f"{component2_url}/alerts/subscribe"
+        self.health_url = f"{component2_url}/health"
+        # Reused across calls so connections are kept alive
+        self.owns_client = client is None
+        self.client = client or create_http_client()
+    
+    async def aclose(self):
+        """Close the HTTP client if this interface created it"""
+        if self.owns_client:
+            await self.client.aclose()
     
-    def send_interaction_patterns(self, session_data: Dict) -> bool:
+    async def send_interaction_patterns(self, session_data: Dict) -> bool:
         """
         Send anonymized interaction patterns for model refinement
         
@@ -102,8 +318,8 @@ class Component2Interface:
             Success status
         """
         try:
-            response = requests.post(
-                f"{self.base_url}/patterns/upload",
+            response = await request_with_retry(
+                self.client, "POST", self.patterns_url,
                 json={'data': session_data}
             )
             return response.status_code == 200
@@ -111,7 +327,7 @@ class Component2Interface:
             print(f"Error sending patterns: {e}")
         return False
     
-    def get_risk_prediction(self, conversation_excerpt: str) -> Dict:
+    async def get_risk_prediction(self, conversation_excerpt: str) -> Dict:
         """
         Get stress/cognitive risk prediction for conversation
         
@@ -122,17 +338,17 @@ class Component2Interface:
             Risk prediction results
         """
         try:
-            response = requests.post(
-                f"{self.base_url}/predict/risk",
+            response = await request_with_retry(
+                self.client, "POST", self.risk_url,
                 json={'text': conversation_excerpt}
             )
             if response.status_code == 200:
-                return response.json()
+                return orjson.loads(response.content)
         except Exception as e:
             print(f"Error getting risk prediction: {e}")
         return {}
     
-    def subscribe_to_high_risk_alerts(self, callback_url: str) -> bool:
+    async def subscribe_to_high_risk_alerts(self, callback_url: str) -> bool:
         """
         Subscribe to receive alerts for high-risk scenarios
         
@@ -143,8 +359,8 @@ class Component2Interface:
             Success status
         """
         try:
-            response = requests.post(
-                f"{self.base_url}/alerts/subscribe",
+            response = await request_with_retry(
+                self.client, "POST", self.alerts_url,
                 json={'callback_url': callback_url}
             )
             return response.status_code == 200
@@ -159,10 +375,24 @@ class Component4Interface:
     Shares resilience insights and receives peer matching recommendations
     """
     
-    def __init__(self, component4_url: str = "http://localhost:8004"):
+    def __init__(self, component4_url: str = "http://localhost:8004",
+                 client: Optional[httpx.AsyncClient] = None):
         self.base_url = component4_url
+        # Endpoint URLs, built once
+        self.insights_url = f"{component4_url}/resilience/insights"
+        self.peers_url = f"{component4_url}/peers/match"
+        self.resources_url = f"{component4_url}/community/resources"
+        self.health_url = f"{component4_url}/health"
+        # Reused across calls so connections are kept alive
+        self.owns_client = client is None
+        self.client = client or create_http_client()
     
-    def send_resilience_insights(self, insights: Dict) -> bool:
+    async def aclose(self):
+        """Close the HTTP client if this interface created it"""
+        if self.owns_client:
+            await self.client.aclose()
+    
+    async def send_resilience_insights(self, insights: Dict) -> bool:
         """
         Send anonymized resilience insights from conversations
         
@@ -173,8 +403,8 @@ class Component4Interface:
             Success status
         """
         try:
-            response = requests.post(
-                f"{self.base_url}/resilience/insights",
+            response = await request_with_retry(
+                self.client, "POST", self.insights_url,
                 json={'insights': insights}
             )
             return response.status_code == 200
@@ -182,28 +412,58 @@ class Component4Interface:
             print(f"Error sending insights: {e}")
         return False
     
-    def get_peer_recommendations(self, user_profile: Dict) -> List[Dict]:
+    async def iter_peer_recommendations(self, user_profile: Dict) -> AsyncIterator[Dict]:
+        """
+        Yield peer matching recommendations as they arrive
+        
+        The response is parsed incrementally, so each recommendation is
+        available as soon as its bytes are, and a caller that stops early
+        never reads (or holds) the rest. Errors propagate.
+        
+        Args:
+            user_profile: Anonymized user resilience profile
+        """
+        import ijson  # only needed here, so importers of this module don't load it
+        
+        response = await request_with_retry(
+            self.client, "POST", self.peers_url,
+            json={'profile': user_profile}, stream=True
+        )
+        try:
+            if response.status_code != 200:
+                return
+            async for peer in ijson.items_async(StreamReader(response), 'peers.item', use_float=True):
+                yield peer
+        finally:
+            await response.aclose()
+    
+    async def get_peer_recommendations(self, user_profile: Dict,
+                                       limit: Optional[int] = None) -> List[Dict]:
         """
         Get peer matching recommendations based on resilience profile
         
         Args:
             user_profile: Anonymized user resilience profile
+            limit: Return at most this many (the rest of the response is not read)
         
         Returns:
             List of peer group recommendations
         """
+        peers = []
+        peer_iter = self.iter_peer_recommendations(user_profile)
         try:
-            response = requests.post(
-                f"{self.base_url}/peers/match",
-                json={'profile': user_profile}
-            )
-            if response.status_code == 200:
-                return response.json()['peers']
+            async for peer in peer_iter:
+                peers.append(peer)
+                if limit is not None and len(peers) >= limit:
+                    break
         except Exception as e:
             print(f"Error getting peer recommendations: {e}")
-        return []
+            return []
+        finally:
+            await peer_iter.aclose()
+        return peers
     
-    def fetch_community_resources(self, topic: str) -> List[Dict]:
+    async def fetch_community_resources(self, topic: str) -> List[Dict]:
         """
         Fetch community-driven support resources
         
@@ -213,16 +473,24 @@ class Component4Interface:
         Returns:
             List of community resources
         """
+        key = (self.resources_url, topic)
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            response = requests.get(
-                f"{self.base_url}/community/resources",
+            response = await request_with_retry(
+                self.client, "GET", self.resources_url,
                 params={'topic': topic}
             )
             if response.status_code == 200:
-                return response.json()['resources']
+                resources = orjson.loads(response.content)['resources']
+                response_cache.set(key, resources, COMMUNITY_RESOURCES_TTL)
+                return resources
         except Exception as e:
             print(f"Error fetching resources: {e}")
-        return []
+        # Serve the last good result, even if expired, rather than nothing
+        return response_cache.get_stale(key, [])
 
 
 class IntegrationManager:
@@ -230,40 +498,130 @@ class IntegrationManager:
     Manages integration with all platform components
     """
     
-    def __init__(self):
-        self.component1 = Component1Interface()
-        self.component2 = Component2Interface()
-        self.component4 = Component4Interface()
-        self.integration_log = []
+    def __init__(self, gateway_url: Optional[str] = None, log_path: Optional[str] = None):
+        """
+        Args:
+            gateway_url: Base URL of a backend serving /integrations/enhance;
+                enhance_batch uses it to reach Components 2 and 4 in one call
+            log_path: JSONL file that integration events are appended to
+                (kept in memory only when not given)
+        """
+        self.gateway_url = gateway_url
+        self.enhance_url = f"{gateway_url}/integrations/enhance" if gateway_url else None
+        # Unknown until the first gateway call; False once it answers 404
+        self.gateway_available = None
+        # One connection pool shared by every component interface
+        self.client = create_http_client()
+        self.component1 = Component1Interface(client=self.client)
+        self.component2 = Component2Interface(client=self.client)
+        self.component4 = Component4Interface(client=self.client)
+        # (time.time(), event_type, component, details) tuples; formatting
+        # waits until an event is written out or reported
+        self.integration_log = deque(maxlen=INTEGRATION_LOG_SIZE)
+        self.last_event = None
+        self.log_path = log_path
+        self.log_flusher = None
+        self.flush_requested = None
+    
+    def start_log_flusher(self):
+        """Start appending logged events to log_path in the background"""
+        if self.log_path and self.log_flusher is None:
+            self.flush_requested = asyncio.Event()
+            self.log_flusher = asyncio.create_task(self._flush_periodically())
+    
+    async def aclose(self):
+        """Write out pending events and close pooled connections (call on shutdown)"""
+        if self.log_flusher is not None:
+            self.log_flusher.cancel()
+            self.log_flusher = None
+            await self.flush_integration_log()
+        await self.client.aclose()
     
     def log_integration_event(self, event_type: str, component: str, 
                              details: Dict[str, Any]):
         """Log integration event"""
-        self.integration_log.append({
-            'timestamp': datetime.now().isoformat(),
+        event = (time.time(), event_type, component, details)
+        self.integration_log.append(event)
+        self.last_event = event
+        if self.flush_requested is not None and len(self.integration_log) >= LOG_FLUSH_SIZE:
+            self.flush_requested.set()
+    
+    @staticmethod
+    def format_event(event: tuple) -> Dict:
+        """Turn a logged event tuple into its dict form"""
+        timestamp, event_type, component, details = event
+        return {
+            'timestamp': datetime.fromtimestamp(timestamp).isoformat(),
             'event_type': event_type,
             'component': component,
             'details': details
-        })
+        }
+    
+    async def flush_integration_log(self):
+        """Move every logged event to the end of log_path"""
+        if not self.log_path or not self.integration_log:
+            return
+        
+        events = [self.integration_log.popleft() for _ in range(len(self.integration_log))]
+        data = b''.join(orjson.dumps(self.format_event(event)) + b'\n' for event in events)
+        
+        def append():
+            with open(self.log_path, 'ab') as f:
+                f.write(data)
+        
+        await asyncio.to_thread(append)
+    
+    async def _flush_periodically(self):
+        """Flush every LOG_FLUSH_INTERVAL, or sooner once LOG_FLUSH_SIZE events wait"""
+        while True:
+            try:
+                await asyncio.wait_for(self.flush_requested.wait(), LOG_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self.flush_requested.clear()
+            try:
+                await self.flush_integration_log()
+            except OSError as e:
+                print(f"Could not write integration log: {e}")
     
-    def enhance_conversation_with_integrations(self, 
+    async def enhance_conversation_with_integrations(self, 
                                               session_data: Dict,
-                                              conversation_text: str) -> Dict:
+                                              conversation_text: str,
+                                              profile: Optional[Dict] = None) -> Dict:
         """
         Enhance conversation using integrated components
         
         Args:
             session_data: Current session data
             conversation_text: Recent conversation
+            profile: Anonymized resilience profile for peer matching
         
         Returns:
             Enhancement data (risk levels, peer suggestions, etc.)
         """
         enhancements = {}
         
+        # The two calls are independent, so wait for the slower one rather
+        # than for both in turn; failures come back as exception results
+        risk_prediction, peer_recs = await asyncio.gather(
+            asyncio.wait_for(
+                self.component2.get_risk_prediction(conversation_text),
+                ENHANCEMENT_TIMEOUT
+            ),
+            asyncio.wait_for(
+                self.component4.get_peer_recommendations(
+                    profile or {'interests': [], 'challenges': []},  # Simplified
+                    limit=3
+                ),
+                ENHANCEMENT_TIMEOUT
+            ),
+            return_exceptions=True
+        )
+        
         # Get risk prediction from Component 2
         try:
-            risk_prediction = self.component2.get_risk_prediction(conversation_text)
+            if isinstance(risk_prediction, Exception):
+                raise risk_prediction
             enhancements['risk_level'] = risk_prediction.get('risk_level', 'unknown')
             enhancements['stress_indicators'] = risk_prediction.get('indicators', [])
             
@@ -277,10 +635,9 @@ class IntegrationManager:
         
         # Get peer recommendations from Component 4
         try:
-            peer_recs = self.component4.get_peer_recommendations(
-                {'interests': [], 'challenges': []}  # Simplified
-            )
-            enhancements['peer_suggestions'] = peer_recs[:3]  # Top 3
+            if isinstance(peer_recs, Exception):
+                raise peer_recs
+            enhancements['peer_suggestions'] = peer_recs  # Top 3
             
             self.log_integration_event(
                 'peer_matching',
@@ -292,7 +649,39 @@ class IntegrationManager:
         
         return enhancements
     
-    def sync_data_periodically(self, session_manager):
+    async def enhance_batch(self, conversation_text: str,
+                            profile: Optional[Dict] = None) -> Dict:
+        """
+        Enhance conversation with one call to the integration gateway
+        
+        The gateway queries Components 2 and 4 itself, so this costs one
+        round trip instead of two. Without a gateway (none configured, or it
+        answered 404) the components are called directly.
+        
+        Args:
+            conversation_text: Recent conversation
+            profile: Anonymized resilience profile for peer matching
+        
+        Returns:
+            Enhancement data, as from enhance_conversation_with_integrations
+        """
+        if self.enhance_url and self.gateway_available is not False:
+            try:
+                response = await request_with_retry(
+                    self.client, "POST", self.enhance_url,
+                    json={'text': conversation_text, 'profile': profile}
+                )
+                if response.status_code == 404:
+                    self.gateway_available = False
+                elif response.status_code == 200:
+                    self.gateway_available = True
+                    return orjson.loads(response.content)
+            except Exception as e:
+                print(f"Error calling integration gateway: {e}")
+        
+        return await self.enhance_conversation_with_integrations({}, conversation_text, profile)
+    
+    async def sync_data_periodically(self, session_manager):
         """
         Periodically sync data with other components
         
@@ -304,7 +693,7 @@ class IntegrationManager:
             aggregated = session_manager.export_aggregated_data(
                 None  # DP mechanism should be passed
             )
-            self.component2.send_interaction_patterns(aggregated)
+            await self.component2.send_interaction_patterns(aggregated)
             
             self.log_integration_event(
                 'data_sync',
@@ -317,23 +706,42 @@ class IntegrationManager:
         # Send resilience insights to Component 4
         # (Would extract from conversation analysis)
         
-    def get_integration_status(self) -> Dict:
+    async def get_integration_status(self) -> Dict:
         """Get status of all component integrations"""
+        # Probe every component at once
+        component1, component2, component4 = await asyncio.gather(
+            self._check_component_health(self.component1.health_url),
+            self._check_component_health(self.component2.health_url),
+            self._check_component_health(self.component4.health_url)
+        )
         status = {
-            'component1': self._check_component_health(self.component1.base_url),
-            'component2': self._check_component_health(self.component2.base_url),
-            'component4': self._check_component_health(self.component4.base_url),
-            'last_sync': self.integration_log[-1] if self.integration_log else None
+            'component1': component1,
+            'component2': component2,
+            'component4': component4,
+            'last_sync': self.format_event(self.last_event) if self.last_event else None
         }
         return status
     
-    def _check_component_health(self, url: str) -> str:
+    async def _check_component_health(self, health_url: str) -> str:
         """Check if component is reachable"""
+        key = (health_url,)
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            response = requests.get(f"{url}/health", timeout=2)
-            return 'online' if response.status_code == 200 else 'error'
+            # One quick retry only, and the whole probe is capped, so the
+            # status check takes at most HEALTH_CHECK_BUDGET
+            response = await asyncio.wait_for(
+                request_with_retry(self.client, "GET", health_url, max_retries=1, timeout=2),
+                HEALTH_CHECK_BUDGET
+            )
+            status = 'online' if response.status_code == 200 else 'error'
         except:
-            return 'offline'
+            status = 'offline'
+        
+        response_cache.set(key, status, HEALTH_TTL)
+        return status
 
 
 if __name__ == "__main__":
@@ -342,4 +750,4 @@ if __name__ == "__main__":
     print("- Component 1: Privacy-Preserving Mental Health Simulation")
     print("- Component 2: Stress and Cognitive Risk Prediction")
     print("- Component 4: Resilience Clustering System")
-    print("\nTo use: Initialize IntegrationManager and call appropriate methods")
+    print("\nTo use: Initialize IntegrationManager and await its methods from async code")
@@ -6,11 +6,11 @@ Loads environment variables and provides configuration
 import os
 from pathlib import Path
 from typing import Optional
-from dotenv import load_dotenv
 
-# Load .env file if it exists
+# Load .env file if it exists (python-dotenv is only imported when it does)
 env_path = Path(".") / ".env"
 if env_path.exists():
+    from dotenv import load_dotenv
     load_dotenv(env_path)
 
 
@@ -74,11 +74,17 @@ class Config:
     MODELS_DIR: Path = BASE_DIR / "models"
     LOGS_DIR: Path = BASE_DIR / "logs"
     
+    _directories_ready: bool = False
+    
     @classmethod
     def ensure_directories(cls):
-        """Ensure required directories exist"""
+        """Ensure required directories exist (checked once per process)"""
+        if cls._directories_ready:
+            return
         for dir_path in [cls.DATA_DIR, cls.MODELS_DIR, cls.LOGS_DIR]:
-            dir_path.mkdir(parents=True, exist_ok=True)
+            if not dir_path.is_dir():
+                dir_path.mkdir(parents=True, exist_ok=True)
+        cls._directories_ready = True
     
     @classmethod
     def get_crisis_resources(cls) -> dict:
@@ -5,8 +5,13 @@ Streamlit-based user interface
 
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-from datetime import datetime
+import textwrap
+from collections import deque
+import threading
+import time
 import sys
 import os
 
@@ -16,6 +21,18 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Configuration
 API_URL = "http://localhost:8000"
 
+# (connect, read) timeouts in seconds for backend calls
+REQUEST_TIMEOUT = (3, 30)
+
+# Connection pools kept by the shared HTTP session, and connections per pool.
+# Plain keep-alive HTTP/1.1: uvicorn does not serve HTTP/2, so a multiplexing
+# client would gain nothing here.
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 20
+
+# Messages kept for display; the backend keeps the full history
+MAX_DISPLAYED_MESSAGES = 200
+
 # Page configuration
 st.set_page_config(
     page_title="Manō - Mental Health Support",
@@ -24,8 +41,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS
-st.markdown("""
+# Custom CSS, whitespace-collapsed once when the module loads so each rerun
+# sends the smallest possible style element
+CUSTOM_CSS = " ".join("""
 <style>
     .main-header {
         font-size: 3rem;
@@ -75,34 +93,6 @@ st.markdown("""
         background-color: #E1F5FE;
         border-color: #29B6F6;
     }
-    .chat-message-user {
-        background-color: #BBDEFB;
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 0.5rem 0;
-        border-left: 4px solid #1976D2;
-    }
-    .chat-message-user strong {
-        color: #0D47A1;
-        font-size: 1rem;
-    }
-    .chat-message-user {
-        color: #1a1a1a;
-    }
-    .chat-message-bot {
-        background-color: #F5F5F5;
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 0.5rem 0;
-        border-left: 4px solid #757575;
-    }
-    .chat-message-bot strong {
-        color: #212121;
-        font-size: 1rem;
-    }
-    .chat-message-bot {
-        color: #1a1a1a;
-    }
     .crisis-alert {
         background-color: #FFCDD2;
         border: 3px solid #C62828;
@@ -139,7 +129,8 @@ st.markdown("""
         padding: 0 !important;
     }
 </style>
-""", unsafe_allow_html=True)
+""".split())
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 
 def initialize_session():
@@ -147,21 +138,101 @@ def initialize_session():
     if 'session_id' not in st.session_state:
         st.session_state.session_id = None
     if 'messages' not in st.session_state:
-        st.session_state.messages = []
+        st.session_state.messages = deque(maxlen=MAX_DISPLAYED_MESSAGES)
     if 'current_persona' not in st.session_state:
         st.session_state.current_persona = 'friend'
-    if 'input_counter' not in st.session_state:
-        st.session_state.input_counter = 0
     if 'questionnaire_completed' not in st.session_state:
         st.session_state.questionnaire_completed = False
     if 'behavior_score' not in st.session_state:
         st.session_state.behavior_score = None
 
 
+@st.cache_resource
+def get_http_session():
+    """
+    HTTP session shared across reruns, so backend connections are kept alive
+    
+    Failed connections are retried for every request (nothing reached the
+    backend); 5xx responses and read errors only for GETs, so a chat message
+    or questionnaire is never submitted twice. The pool holds up to
+    HTTP_POOL_MAXSIZE connections per host, since every browser session's
+    script thread uses this one session.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(['GET'])
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=retry
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class HealthBreaker:
+    """
+    Backend health state shared across reruns (a small circuit breaker)
+    
+    A healthy backend is re-probed at most every UP_TTL seconds. After a
+    failed probe the last state is reused for 2**failures seconds (at most
+    MAX_BACKOFF), so a stopped backend doesn't stall every rerun.
+    """
+    
+    UP_TTL = 15
+    MAX_BACKOFF = 30
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = None  # 'up', 'error' (answered, but not 200) or 'offline'
+        self.next_probe = 0.0
+        self.fail_streak = 0
+        # Without the retrying adapter: the breaker decides when to try again
+        self.session = requests.Session()
+    
+    def status(self) -> str:
+        """Current backend state, probing only when the cached one is due"""
+        with self.lock:
+            now = time.monotonic()
+            if now < self.next_probe:
+                return self.state
+            
+            try:
+                response = self.session.get(f"{API_URL}/health", timeout=(1, 5))
+                self.state = 'up' if response.status_code == 200 else 'error'
+            except Exception:
+                self.state = 'offline'
+            
+            if self.state == 'up':
+                self.fail_streak = 0
+                self.next_probe = now + self.UP_TTL
+            else:
+                self.fail_streak += 1
+                self.next_probe = now + min(self.MAX_BACKOFF, 2 ** self.fail_streak)
+            return self.state
+    
+    def reset(self):
+        """Probe again on the next status() call (e.g. after a manual retry)"""
+        with self.lock:
+            self.next_probe = 0.0
+            self.fail_streak = 0
+
+
+@st.cache_resource
+def get_health_breaker():
+    return HealthBreaker()
+
+
 def create_session():
     """Create a new chat session"""
     try:
-        response = requests.post(f"{API_URL}/session/create", json={})
+        response = get_http_session().post(f"{API_URL}/session/create", json={},
+                                           timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             return response.json()['session_id']
     except Exception as e:
@@ -169,35 +240,50 @@ def create_session():
     return None
 
 
-def send_message(session_id, message, persona):
-    """Send a message to the chatbot"""
+def stream_message(session_id, message, persona):
+    """
+    Send a message to the chatbot and yield the reply as it is generated
+    
+    Yields the frames of the /chat/stream response: {"chunk": ...} for each
+    piece of the reply, then one frame with "done" set and the same fields
+    as a /chat response. A failure reported by the backend mid-stream is
+    shown as an error and nothing more is yielded.
+    """
     try:
-        response = requests.post(
-            f"{API_URL}/chat",
+        with get_http_session().post(
+            f"{API_URL}/chat/stream",
             json={
                 "session_id": session_id,
                 "message": message,
                 "persona": persona
-            }
-        )
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error(f"Error: {response.status_code}")
+            },
+            stream=True,
+            timeout=REQUEST_TIMEOUT
+        ) as response:
+            if response.status_code != 200:
+                st.error(f"Error: {response.status_code}")
+                return
+            for line in response.iter_lines():
+                if line.startswith(b"data: "):
+                    frame = json.loads(line[len(b"data: "):])
+                    if frame.get('error'):
+                        st.error(f"Error generating response: {frame['error']}")
+                        return
+                    yield frame
     except Exception as e:
         st.error(f"Error sending message: {e}")
-    return None
 
 
 def submit_questionnaire(session_id, answers):
     """Submit questionnaire answers to the backend"""
     try:
-        response = requests.post(
+        response = get_http_session().post(
             f"{API_URL}/questionnaire/submit",
             json={
                 "session_id": session_id,
                 "answers": answers
-            }
+            },
+            timeout=REQUEST_TIMEOUT
         )
         if response.status_code == 200:
             return response.json()
@@ -337,14 +423,9 @@ def display_questionnaire():
             """, unsafe_allow_html=True)
 
 
-def display_persona_selector():
-    """Display persona selection"""
-    st.sidebar.markdown("---")
-    st.sidebar.title("🎭 Choose Your Support Persona")
-    
-    # Friend Persona
-    with st.sidebar.expander("👥 Friend", expanded=(st.session_state.current_persona == 'friend')):
-        st.markdown("""
+# (persona, icon, name, description card) for the persona selector
+PERSONA_CARDS = [
+    ('friend', "👥", "Friend", """
         <div class='persona-card friend-card'>
             <h4>Friendly & Supportive</h4>
             <p>A warm, casual friend who listens and provides emotional comfort.</p>
@@ -355,14 +436,8 @@ def display_persona_selector():
                 <li>Encouragement</li>
             </ul>
         </div>
-        """, unsafe_allow_html=True)
-        if st.button("Select Friend", key="select_friend"):
-            st.session_state.current_persona = 'friend'
-            st.rerun()
-    
-    # Counselor Persona
-    with st.sidebar.expander("🧑‍⚕️ Counselor", expanded=(st.session_state.current_persona == 'counselor')):
-        st.markdown("""
+        """),
+    ('counselor', "🧑‍⚕️", "Counselor", """
         <div class='persona-card counselor-card'>
             <h4>Professional & Therapeutic</h4>
             <p>A professional counselor providing therapeutic support and coping strategies.</p>
@@ -373,14 +448,8 @@ def display_persona_selector():
                 <li>Solution-focused</li>
             </ul>
         </div>
-        """, unsafe_allow_html=True)
-        if st.button("Select Counselor", key="select_counselor"):
-            st.session_state.current_persona = 'counselor'
-            st.rerun()
-    
-    # Medical Officer Persona
-    with st.sidebar.expander("👨‍⚕️ Medical Officer", expanded=(st.session_state.current_persona == 'medical_officer')):
-        st.markdown("""
+        """),
+    ('medical_officer', "👨‍⚕️", "Medical Officer", """
         <div class='persona-card doctor-card'>
             <h4>Clinical & Informational</h4>
             <p>A medical professional providing clinical information and guidance.</p>
@@ -391,10 +460,71 @@ def display_persona_selector():
                 <li>Clinical perspective</li>
             </ul>
         </div>
-        """, unsafe_allow_html=True)
-        if st.button("Select Medical Officer", key="select_medical_officer"):
-            st.session_state.current_persona = 'medical_officer'
-            st.rerun()
+        """)
+]
+
+
+def display_persona_selector():
+    """Display persona selection"""
+    st.sidebar.markdown("---")
+    st.sidebar.title("🎭 Choose Your Support Persona")
+    
+    for persona, icon, name, card_html in PERSONA_CARDS:
+        with st.sidebar.expander(f"{icon} {name}", expanded=(st.session_state.current_persona == persona)):
+            st.markdown(card_html, unsafe_allow_html=True)
+            if st.button(f"Select {name}", key=f"select_{persona}"):
+                st.session_state.current_persona = persona
+                st.rerun()
+
+
+PERSONA_ICONS = {
+    'friend': '👥',
+    'counselor': '🧑‍⚕️',
+    'medical_officer': '👨‍⚕️'
+}
+
+PERSONA_NAMES = {
+    'friend': '👥 Friend',
+    'counselor': '🧑‍⚕️ Counselor',
+    'medical_officer': '👨‍⚕️ Medical Officer'
+}
+
+# Markdown heading that starts each bot reply
+PERSONA_HEADERS = {persona: f"**{persona.capitalize()}:**\n\n" for persona in PERSONA_ICONS}
+
+CRISIS_ALERT_HTML = """
+<div class='crisis-alert'>
+    <strong>⚠️ Crisis Detected</strong><br>
+    If you're experiencing thoughts of self-harm, please contact:
+    <ul>
+        <li>National Suicide Prevention Lifeline: 988</li>
+        <li>Crisis Text Line: Text HELLO to 741741</li>
+        <li>Emergency Services: 911</li>
+    </ul>
+</div>
+"""
+
+
+def display_message(msg):
+    """
+    Render one chat message with Streamlit's chat elements
+    
+    Each message is its own chat_message container (avatar and alignment);
+    the reply is rendered as plain markdown, and only the fixed crisis
+    alert is sent with HTML enabled.
+    """
+    if msg['role'] == 'user':
+        with st.chat_message("user"):
+            st.markdown(msg['content'])
+        return
+    
+    persona = msg.get('persona', 'friend')
+    with st.chat_message("assistant", avatar=PERSONA_ICONS.get(persona, '🤖')):
+        st.markdown(PERSONA_HEADERS.get(persona, "**Bot:**\n\n") + msg['content'])
+        
+        # Show crisis alert if detected
+        if msg.get('crisis_detected'):
+            st.markdown(CRISIS_ALERT_HTML, unsafe_allow_html=True)
 
 
 def display_chat():
@@ -403,72 +533,36 @@ def display_chat():
     st.markdown("<p class='sub-header'>Empathetic Mental Health Support for STEM Professionals</p>", unsafe_allow_html=True)
     
     # Display current persona
-    persona_names = {
-        'friend': '👥 Friend',
-        'counselor': '🧑‍⚕️ Counselor',
-        'medical_officer': '👨‍⚕️ Medical Officer'
-    }
-    st.info(f"**Currently chatting with:** {persona_names[st.session_state.current_persona]}")
+    persona_name = PERSONA_NAMES[st.session_state.current_persona]
+    st.info(f"**Currently chatting with:** {persona_name}")
     
     # Display chat history
     chat_container = st.container()
     with chat_container:
         for msg in st.session_state.messages:
-            if msg['role'] == 'user':
-                st.markdown(f"""
-                <div class='chat-message-user'>
-                    <strong>You:</strong><br>
-                    {msg['content']}
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                persona_icon = {
-                    'friend': '👥',
-                    'counselor': '🧑‍⚕️',
-                    'medical_officer': '👨‍⚕️'
-                }.get(msg.get('persona', 'friend'), '🤖')
-                
-                st.markdown(f"""
-                <div class='chat-message-bot'>
-                    <strong>{persona_icon} {msg.get('persona', 'Bot').capitalize()}:</strong><br>
-                    {msg['content']}
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Show crisis alert if detected
-                if msg.get('crisis_detected'):
-                    st.markdown("""
-                    <div class='crisis-alert'>
-                        <strong>⚠️ Crisis Detected</strong><br>
-                        If you're experiencing thoughts of self-harm, please contact:
-                        <ul>
-                            <li>National Suicide Prevention Lifeline: 988</li>
-                            <li>Crisis Text Line: Text HELLO to 741741</li>
-                            <li>Emergency Services: 911</li>
-                        </ul>
-                    </div>
-                    """, unsafe_allow_html=True)
+            display_message(msg)
     
     # Input area
     st.markdown("---")
     
-    # Create columns for inline layout
-    col_input, col_send = st.columns([5, 1])
-    
-    with col_input:
-        user_input = st.text_area(
-            "Type your message here...",
-            key=f"user_input_{st.session_state.input_counter}",
-            height=100,
-            placeholder=f"Chat with {persona_names[st.session_state.current_persona]}...",
-            label_visibility="collapsed"
-        )
-    
-    with col_send:
-        st.markdown("<br>", unsafe_allow_html=True)  # Spacing
-        send_button = st.button("📤", use_container_width=True, help="Send message")
-        st.markdown("<br>", unsafe_allow_html=True)  # Spacing
-        clear_button = st.button("🗑️", use_container_width=True, help="Clear chat")
+    # A form, so typing doesn't rerun the script; the input clears on submit
+    with st.form("chat_form", clear_on_submit=True):
+        # Create columns for inline layout
+        col_input, col_send = st.columns([5, 1])
+        
+        with col_input:
+            user_input = st.text_area(
+                "Type your message here...",
+                height=100,
+                placeholder=f"Chat with {persona_name}...",
+                label_visibility="collapsed"
+            )
+        
+        with col_send:
+            st.markdown("<br>", unsafe_allow_html=True)  # Spacing
+            send_button = st.form_submit_button("📤", use_container_width=True, help="Send message")
+            st.markdown("<br>", unsafe_allow_html=True)  # Spacing
+            clear_button = st.form_submit_button("🗑️", use_container_width=True, help="Clear chat")
     
     # Handle send button
     if send_button and user_input.strip():
@@ -476,23 +570,38 @@ def display_chat():
             st.session_state.session_id = create_session()
         
         if st.session_state.session_id:
-            # Store the message before clearing
             message_to_send = user_input.strip()
             
-            # Add user message
-            st.session_state.messages.append({
+            # Add user message (only what the chat displays is kept)
+            user_message = {
                 'role': 'user',
-                'content': message_to_send,
-                'timestamp': datetime.now().isoformat()
-            })
+                'content': message_to_send
+            }
+            st.session_state.messages.append(user_message)
             
-            # Get bot response
-            with st.spinner("Thinking..."):
-                response = send_message(
-                    st.session_state.session_id,
-                    message_to_send,
-                    st.session_state.current_persona
-                )
+            # Stream the bot response into the chat as it is generated, then
+            # leave it in place: the page already shows the whole exchange,
+            # so no extra rerun is needed (the form has cleared the input)
+            response = None
+            with chat_container:
+                display_message(user_message)
+                persona = st.session_state.current_persona
+                with st.chat_message("assistant", avatar=PERSONA_ICONS.get(persona, '🤖')):
+                    placeholder = st.empty()
+                    reply = ""
+                    for frame in stream_message(st.session_state.session_id, message_to_send, persona):
+                        if frame.get('done'):
+                            response = frame
+                        else:
+                            reply += frame['chunk']
+                            placeholder.markdown(f"{PERSONA_HEADERS[persona]}{reply}▌")
+                    
+                    if response:
+                        placeholder.markdown(PERSONA_HEADERS[persona] + response['bot_response'])
+                        if response.get('crisis_detected'):
+                            st.markdown(CRISIS_ALERT_HTML, unsafe_allow_html=True)
+                    else:
+                        placeholder.empty()
             
             if response:
                 # Add bot message
@@ -500,31 +609,20 @@ def display_chat():
                     'role': 'bot',
                     'content': response['bot_response'],
                     'persona': response['persona'],
-                    'intent': response.get('intent'),
-                    'confidence': response.get('confidence'),
-                    'crisis_detected': response.get('crisis_detected', False),
-                    'timestamp': datetime.now().isoformat()
+                    'crisis_detected': response.get('crisis_detected', False)
                 })
-            
-            # Increment counter to clear the input by creating a new widget
-            st.session_state.input_counter += 1
-            
-            st.rerun()
     
     # Handle clear button
     if clear_button:
-        st.session_state.messages = []
+        st.session_state.messages = deque(maxlen=MAX_DISPLAYED_MESSAGES)
         st.session_state.session_id = None
         st.rerun()
 
 
-def display_info():
-    """Display information sidebar"""
-    st.sidebar.markdown("---")
-    st.sidebar.title("ℹ️ About Manō")
-    
-    with st.sidebar.expander("What is Manō?"):
-        st.write("""
+# (title, markdown) for the sidebar's information panels, dedented once
+# when the module loads
+INFO_PANELS = [(title, textwrap.dedent(text).strip()) for title, text in [
+    ("What is Manō?", """
         Manō is an empathetic conversational support system designed specifically 
         for STEM professionals dealing with stress, burnout, and mental health challenges.
         
@@ -533,34 +631,39 @@ def display_info():
         - 🎭 Three personas (Friend, Counselor, Medical Officer)
         - 💡 Evidence-based support
         - 📚 Resource recommendations
-        """)
-    
-    with st.sidebar.expander("Privacy & Security"):
-        st.write("""
+        """),
+    ("Privacy & Security", """
         Your privacy matters:
         - All conversations are anonymized
         - Differential privacy protocols applied
         - No personal data stored
         - Session-based (temporary storage)
-        """)
-    
-    with st.sidebar.expander("Crisis Resources"):
-        st.write("""
+        """),
+    ("Crisis Resources", """
         **Immediate Help:**
         - 🆘 National Suicide Prevention Lifeline: **988**
         - 💬 Crisis Text Line: Text **HELLO** to **741741**
         - 🚨 Emergency: **911**
         
         **This is not a substitute for professional help.**
-        """)
-    
-    with st.sidebar.expander("Disclaimer"):
-        st.write("""
+        """),
+    ("Disclaimer", """
         Manō is an AI-powered support tool and **NOT** a replacement for 
         professional mental health care. If you're experiencing a mental 
         health crisis or need clinical treatment, please contact a 
         licensed mental health professional.
         """)
+]]
+
+
+def display_info():
+    """Display information sidebar"""
+    st.sidebar.markdown("---")
+    st.sidebar.title("ℹ️ About Manō")
+    
+    for title, text in INFO_PANELS:
+        with st.sidebar.expander(title):
+            st.markdown(text)
 
 
 def main():
@@ -569,15 +672,18 @@ def main():
     initialize_session()
     
     # Check if API is running
-    try:
-        response = requests.get(f"{API_URL}/health")
-        if response.status_code != 200:
+    health_breaker = get_health_breaker()
+    api_state = health_breaker.status()
+    if api_state in ('error', 'offline'):
+        if api_state == 'error':
             st.error("⚠️ Backend API is not responding. Please start the API server.")
             st.code("python backend/api.py")
-            return
-    except Exception as e:
-        st.error(f"⚠️ Cannot connect to backend API at {API_URL}")
-        st.info("Please start the backend server: `python backend/api.py`")
+        else:
+            st.error(f"⚠️ Cannot connect to backend API at {API_URL}")
+            st.info("Please start the backend server: `python backend/api.py`")
+        if st.button("🔄 Retry"):
+            health_breaker.reset()
+            st.rerun()
         return
     
     # Display questionnaire
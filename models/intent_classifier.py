@@ -5,45 +5,95 @@ Uses BERT-based model for classifying user intents in mental health conversation
 
 import torch
 import torch.nn as nn
-from transformers import BertTokenizer, BertModel, AutoTokenizer, AutoModel
-from torch.utils.data import Dataset, DataLoader
+import torch.distributed as dist
+from torch.nn.parallel import DistributedDataParallel
+from transformers import BertTokenizerFast, BertModel, AutoTokenizer, AutoModel
+from torch.utils.data import Dataset, DataLoader, DistributedSampler
 import numpy as np
 from sklearn.preprocessing import LabelEncoder
 from typing import List, Tuple, Dict
 import pickle
 import os
+import threading
+from contextlib import nullcontext
+
+
+def is_main_process() -> bool:
+    """True unless this is a non-zero rank of a distributed (torchrun) run"""
+    return not dist.is_initialized() or dist.get_rank() == 0
+
+
+def setup_distributed() -> int:
+    """
+    Join the process group when launched by torchrun with several processes
+    
+    Returns:
+        This process's local rank, or -1 when not running distributed
+    """
+    if int(os.environ.get('WORLD_SIZE', '1')) <= 1:
+        return -1
+    
+    local_rank = int(os.environ['LOCAL_RANK'])
+    if not dist.is_initialized():
+        if torch.cuda.is_available():
+            torch.cuda.set_device(local_rank)
+        dist.init_process_group(backend='nccl' if torch.cuda.is_available() else 'gloo')
+    return local_rank
 
 
 class IntentDataset(Dataset):
-    """Custom dataset for intent classification"""
+    """
+    Custom dataset for intent classification
+    
+    All texts are tokenized (unpadded) in one batched call up front, so
+    fetching an item is just indexing. Padding happens per batch in
+    collate, only up to the longest text in that batch.
+    """
+    
+    # Padded lengths are rounded up to a multiple of this (tensor-core friendly)
+    PAD_MULTIPLE = 8
     
     def __init__(self, texts: List[str], labels: List[str], tokenizer, max_length: int = 128):
         self.texts = texts
-        self.labels = labels
+        self.labels = torch.as_tensor(np.asarray(labels), dtype=torch.long)
         self.tokenizer = tokenizer
         self.max_length = max_length
+        
+        encoding = tokenizer(
+            [str(text) for text in texts],
+            add_special_tokens=True,
+            max_length=max_length,
+            padding=False,
+            truncation=True,
+            return_attention_mask=False
+        )
+        self.input_ids = [torch.tensor(ids, dtype=torch.long) for ids in encoding['input_ids']]
     
     def __len__(self):
         return len(self.texts)
     
     def __getitem__(self, idx):
-        text = str(self.texts[idx])
-        label = self.labels[idx]
-        
-        encoding = self.tokenizer.encode_plus(
-            text,
-            add_special_tokens=True,
-            max_length=self.max_length,
-            padding='max_length',
-            truncation=True,
-            return_attention_mask=True,
-            return_tensors='pt'
-        )
+        return {
+            'input_ids': self.input_ids[idx],
+            'label': self.labels[idx]
+        }
+    
+    def collate(self, items: List[Dict]) -> Dict[str, torch.Tensor]:
+        """DataLoader collate_fn: pad a batch to its longest sequence"""
+        longest = max(len(item['input_ids']) for item in items)
+        length = -(-longest // self.PAD_MULTIPLE) * self.PAD_MULTIPLE
+        
+        input_ids = torch.full((len(items), length), self.tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(items), length), dtype=torch.long)
+        for i, item in enumerate(items):
+            n = len(item['input_ids'])
+            input_ids[i, :n] = item['input_ids']
+            attention_mask[i, :n] = 1
         
         return {
-            'input_ids': encoding['input_ids'].flatten(),
-            'attention_mask': encoding['attention_mask'].flatten(),
-            'label': torch.tensor(label, dtype=torch.long)
+            'input_ids': input_ids,
+            'attention_mask': attention_mask,
+            'label': torch.stack([item['label'] for item in items])
         }
 
 
@@ -75,10 +125,12 @@ class IntentClassificationEngine:
     def __init__(self, model_name: str = 'bert-base-uncased', max_length: int = 128):
         self.model_name = model_name
         self.max_length = max_length
-        self.tokenizer = BertTokenizer.from_pretrained(model_name)
+        self.tokenizer = BertTokenizerFast.from_pretrained(model_name)
         self.label_encoder = LabelEncoder()
         self.model = None
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        # Per-thread input buffers reused by predict_batch
+        self.input_buffers = threading.local()
         print(f"Using device: {self.device}")
     
     def prepare_data(self, texts: List[str], labels: List[str]) -> Tuple:
@@ -93,8 +145,32 @@ class IntentClassificationEngine:
     
     def train(self, train_texts: List[str], train_labels: List[str], 
               val_texts: List[str] = None, val_labels: List[str] = None,
-              epochs: int = 5, batch_size: int = 16, learning_rate: float = 2e-5):
-        """Train the intent classification model"""
+              epochs: int = 5, batch_size: int = 16, learning_rate: float = 2e-5,
+              num_workers: int = 0, gradient_accumulation_steps: int = 1,
+              compile_model: bool = False):
+        """
+        Train the intent classification model
+        
+        With gradient_accumulation_steps K, gradients are averaged over K
+        batches before each optimizer step (effective batch size
+        batch_size * K) without the memory of one large batch.
+        
+        compile_model trains through torch.compile (PyTorch 2.x, dynamic
+        shapes for the per-batch padding); the first batches are slower
+        while it compiles.
+        
+        num_workers sets DataLoader worker processes; the dataset is
+        tokenized up front, so fetching is cheap and 0 is usually fastest.
+        On GPU, batches come from pinned memory and are copied asynchronously.
+        
+        Launched with `torchrun --nproc_per_node=N`, each process trains a
+        DistributedDataParallel replica on its shard of the data (batch_size
+        is per process); only rank 0 prints and saves.
+        """
+        local_rank = setup_distributed()
+        distributed = local_rank >= 0
+        if distributed and torch.cuda.is_available():
+            self.device = torch.device('cuda', local_rank)
         
         # Fit label encoder on all labels (train + val) to avoid unseen labels
         all_labels = train_labels + (val_labels if val_labels else [])
@@ -104,7 +180,15 @@ class IntentClassificationEngine:
         train_encoded_labels = self.label_encoder.transform(train_labels)
         train_dataset = IntentDataset(train_texts, train_encoded_labels, 
                                      self.tokenizer, self.max_length)
-        train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
+        train_sampler = DistributedSampler(train_dataset) if distributed else None
+        loader_options = {
+            'pin_memory': self.device.type == 'cuda',
+            'num_workers': num_workers,
+            'persistent_workers': num_workers > 0
+        }
+        train_loader = DataLoader(train_dataset, batch_size=batch_size,
+                                  shuffle=train_sampler is None, sampler=train_sampler,
+                                  collate_fn=train_dataset.collate, **loader_options)
         n_classes = len(self.label_encoder.classes_)
         
         # Prepare validation data if provided
@@ -113,10 +197,17 @@ class IntentClassificationEngine:
             val_encoded_labels = self.label_encoder.transform(val_labels)
             val_dataset = IntentDataset(val_texts, val_encoded_labels, 
                                        self.tokenizer, self.max_length)
-            val_loader = DataLoader(val_dataset, batch_size=batch_size)
+            val_loader = DataLoader(val_dataset, batch_size=batch_size,
+                                    collate_fn=val_dataset.collate, **loader_options)
         
         # Initialize model
         self.model = IntentClassifier(n_classes, self.model_name).to(self.device)
+        if distributed:
+            self.model = DistributedDataParallel(
+                self.model, device_ids=[local_rank] if self.device.type == 'cuda' else None
+            )
+        if compile_model and hasattr(torch, 'compile'):
+            self.model = torch.compile(self.model, dynamic=True)
         
         # Loss and optimizer with weight decay for regularization
         criterion = nn.CrossEntropyLoss()
@@ -125,30 +216,47 @@ class IntentClassificationEngine:
         # Learning rate scheduler for better convergence
         scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(optimizer, mode='max', factor=0.5, patience=2)
         
+        # Mixed precision on GPU: FP16 forward passes with loss scaling so
+        # small gradients don't underflow (a no-op on CPU)
+        scaler = torch.cuda.amp.GradScaler(enabled=self.device.type == 'cuda')
+        
         # Training loop
         best_val_accuracy = 0
-        print(f"\nTraining for {epochs} epochs...")
+        log = print if is_main_process() else (lambda *args, **kwargs: None)
+        log(f"\nTraining for {epochs} epochs...")
         for epoch in range(epochs):
             self.model.train()
+            if train_sampler is not None:
+                train_sampler.set_epoch(epoch)
             train_loss = 0
             train_correct = 0
             train_total = 0
             
-            for batch in train_loader:
-                input_ids = batch['input_ids'].to(self.device)
-                attention_mask = batch['attention_mask'].to(self.device)
-                labels = batch['label'].to(self.device)
-                
-                optimizer.zero_grad()
-                outputs = self.model(input_ids, attention_mask)
-                loss = criterion(outputs, labels)
-                
-                loss.backward()
+            optimizer.zero_grad(set_to_none=True)
+            for step, batch in enumerate(train_loader, 1):
+                input_ids = batch['input_ids'].to(self.device, non_blocking=True)
+                attention_mask = batch['attention_mask'].to(self.device, non_blocking=True)
+                labels = batch['label'].to(self.device, non_blocking=True)
                 
-                # Gradient clipping to prevent exploding gradients
-                torch.nn.utils.clip_grad_norm_(self.model.parameters(), max_norm=1.0)
+                update = step % gradient_accumulation_steps == 0 or step == len(train_loader)
+                # Under DDP, only synchronize gradients on the update step
+                sync = nullcontext() if update or not distributed else self.model.no_sync()
+                with sync:
+                    with self.autocast():
+                        outputs = self.model(input_ids, attention_mask)
+                        loss = criterion(outputs, labels)
+                    
+                    scaler.scale(loss / gradient_accumulation_steps).backward()
                 
-                optimizer.step()
+                if update:
+                    # Gradient clipping to prevent exploding gradients (on the
+                    # unscaled gradients)
+                    scaler.unscale_(optimizer)
+                    torch.nn.utils.clip_grad_norm_(self.model.parameters(), max_norm=1.0)
+                    
+                    scaler.step(optimizer)
+                    scaler.update()
+                    optimizer.zero_grad(set_to_none=True)
                 
                 train_loss += loss.item()
                 _, predicted = torch.max(outputs, 1)
@@ -158,13 +266,13 @@ class IntentClassificationEngine:
             train_accuracy = 100 * train_correct / train_total
             avg_train_loss = train_loss / len(train_loader)
             
-            print(f"Epoch {epoch+1}/{epochs}")
-            print(f"  Train Loss: {avg_train_loss:.4f}, Train Accuracy: {train_accuracy:.2f}%")
+            log(f"Epoch {epoch+1}/{epochs}")
+            log(f"  Train Loss: {avg_train_loss:.4f}, Train Accuracy: {train_accuracy:.2f}%")
             
             # Validation
             if val_loader:
                 val_loss, val_accuracy = self.evaluate(val_loader, criterion)
-                print(f"  Val Loss: {val_loss:.4f}, Val Accuracy: {val_accuracy:.2f}%")
+                log(f"  Val Loss: {val_loss:.4f}, Val Accuracy: {val_accuracy:.2f}%")
                 
                 # Update learning rate based on validation accuracy
                 scheduler.step(val_accuracy)
@@ -172,9 +280,22 @@ class IntentClassificationEngine:
                 # Save best model
                 if val_accuracy > best_val_accuracy:
                     best_val_accuracy = val_accuracy
-                    print(f"  🎯 New best validation accuracy: {val_accuracy:.2f}%")
+                    log(f"  🎯 New best validation accuracy: {val_accuracy:.2f}%")
             
-        print(f"\n✓ Training completed! Best validation accuracy: {best_val_accuracy:.2f}%")
+        # Keep the plain module for saving and prediction
+        self.model = getattr(self.model, '_orig_mod', self.model)
+        if distributed:
+            self.model = self.model.module
+        log(f"\n✓ Training completed! Best validation accuracy: {best_val_accuracy:.2f}%")
+    
+    def autocast(self):
+        """Mixed-precision (FP16) context for forward passes; disabled on CPU"""
+        use_amp = self.device.type == 'cuda'
+        # (CPU autocast rejects float16, so it gets a dtype it accepts even
+        # though it stays disabled)
+        return torch.autocast(device_type=self.device.type,
+                              dtype=torch.float16 if use_amp else torch.bfloat16,
+                              enabled=use_amp)
     
     def evaluate(self, data_loader, criterion):
         """Evaluate model on validation/test data"""
@@ -185,12 +306,13 @@ class IntentClassificationEngine:
         
         with torch.no_grad():
             for batch in data_loader:
-                input_ids = batch['input_ids'].to(self.device)
-                attention_mask = batch['attention_mask'].to(self.device)
-                labels = batch['label'].to(self.device)
+                input_ids = batch['input_ids'].to(self.device, non_blocking=True)
+                attention_mask = batch['attention_mask'].to(self.device, non_blocking=True)
+                labels = batch['label'].to(self.device, non_blocking=True)
                 
-                outputs = self.model(input_ids, attention_mask)
-                loss = criterion(outputs, labels)
+                with self.autocast():
+                    outputs = self.model(input_ids, attention_mask)
+                    loss = criterion(outputs, labels)
                 
                 val_loss += loss.item()
                 _, predicted = torch.max(outputs, 1)
@@ -204,33 +326,80 @@ class IntentClassificationEngine:
     
     def predict(self, text: str, return_confidence: bool = False) -> str or Tuple[str, float]:
         """Predict intent for a single text"""
-        self.model.eval()
-        
-        encoding = self.tokenizer.encode_plus(
-            text,
-            add_special_tokens=True,
-            max_length=self.max_length,
-            padding='max_length',
-            truncation=True,
-            return_attention_mask=True,
-            return_tensors='pt'
-        )
-        
-        input_ids = encoding['input_ids'].to(self.device)
-        attention_mask = encoding['attention_mask'].to(self.device)
-        
-        with torch.no_grad():
-            outputs = self.model(input_ids, attention_mask)
-            probabilities = torch.softmax(outputs, dim=1)
-            confidence, predicted = torch.max(probabilities, 1)
-        
-        predicted_label = self.label_encoder.inverse_transform([predicted.item()])[0]
+        predicted_label, confidence = self.predict_batch([text])[0]
         
         if return_confidence:
-            return predicted_label, confidence.item()
+            return predicted_label, confidence
         else:
             return predicted_label
     
+    def predict_batch(self, texts: List[str], batch_size: int = 32) -> List[Tuple[str, float]]:
+        """
+        Predict intents with confidence scores for several texts
+        
+        Runs one forward pass per batch_size texts, each padded only to its
+        longest text (rounded up to a multiple of 8, at most max_length)
+        rather than always to max_length, except for a TorchScript-traced
+        model, which needs max_length. Token ids are copied into reused
+        (pinned, on GPU) buffers instead of fresh tensors per call.
+        """
+        self.model.eval()
+        texts = list(texts)
+        results = []
+        traced = isinstance(self.model, torch.jit.ScriptModule)
+        multiple = IntentDataset.PAD_MULTIPLE
+        
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[start:start + batch_size],
+                add_special_tokens=True,
+                max_length=self.max_length,
+                padding=False,
+                truncation=True,
+                return_attention_mask=False
+            )['input_ids']
+            
+            lengths = torch.tensor([len(ids) for ids in encoded])
+            if traced:
+                length = self.max_length
+            else:
+                length = min(-(-int(lengths.max()) // multiple) * multiple, self.max_length)
+            ids_buffer, mask_buffer = self._input_buffers(len(encoded), length)
+            input_ids = ids_buffer[:len(encoded), :length]
+            attention_mask = mask_buffer[:len(encoded), :length]
+            
+            # Mask from the lengths, then scatter all ids in one copy
+            attention_mask.copy_(torch.arange(length) < lengths[:, None])
+            input_ids.fill_(self.tokenizer.pad_token_id)
+            input_ids[attention_mask.bool()] = torch.tensor([i for ids in encoded for i in ids])
+            
+            input_ids = input_ids.to(self.device, non_blocking=True)
+            attention_mask = attention_mask.to(self.device, non_blocking=True)
+            
+            with torch.inference_mode(), self.autocast():
+                outputs = self.model(input_ids, attention_mask)
+                probabilities = torch.softmax(outputs, dim=1)
+                confidences, predicted = torch.max(probabilities, 1)
+            
+            # Index the fitted classes directly (inverse_transform validates
+            # its input on every call)
+            labels = self.label_encoder.classes_[predicted.cpu().numpy()]
+            results.extend(zip(labels, confidences.float().cpu().tolist()))
+        
+        return results
+    
+    def _input_buffers(self, rows: int, length: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """This thread's (input_ids, attention_mask) buffers, grown to fit rows x length"""
+        buffers = getattr(self.input_buffers, 'tensors', None)
+        if buffers is None or buffers[0].shape[0] < rows or buffers[0].shape[1] < length:
+            shape = (max(rows, buffers[0].shape[0] if buffers else 0),
+                     max(length, buffers[0].shape[1] if buffers else 0))
+            pin = self.device.type == 'cuda'
+            buffers = (torch.empty(shape, dtype=torch.long, pin_memory=pin),
+                       torch.empty(shape, dtype=torch.long, pin_memory=pin))
+            self.input_buffers.tensors = buffers
+        return buffers
+    
     def predict_top_k(self, text: str, k: int = 3) -> List[Tuple[str, float]]:
         """Predict top k intents with confidence scores"""
         self.model.eval()
@@ -239,7 +408,7 @@ class IntentClassificationEngine:
             text,
             add_special_tokens=True,
             max_length=self.max_length,
-            padding='max_length',
+            padding='max_length' if isinstance(self.model, torch.jit.ScriptModule) else 'longest',
             truncation=True,
             return_attention_mask=True,
             return_tensors='pt'
@@ -248,24 +417,23 @@ class IntentClassificationEngine:
         input_ids = encoding['input_ids'].to(self.device)
         attention_mask = encoding['attention_mask'].to(self.device)
         
-        with torch.no_grad():
+        with torch.inference_mode(), self.autocast():
             outputs = self.model(input_ids, attention_mask)
             probabilities = torch.softmax(outputs, dim=1)
             top_probs, top_indices = torch.topk(probabilities, k)
         
-        results = []
-        for prob, idx in zip(top_probs[0], top_indices[0]):
-            label = self.label_encoder.inverse_transform([idx.item()])[0]
-            results.append((label, prob.item()))
-        
-        return results
+        labels = self.label_encoder.classes_[top_indices[0].cpu().numpy()]
+        return list(zip(labels, top_probs[0].float().cpu().tolist()))
     
     def save_model(self, save_dir: str):
-        """Save model and label encoder"""
+        """Save model and label encoder (only on rank 0 of a distributed run)"""
+        if not is_main_process():
+            return
         os.makedirs(save_dir, exist_ok=True)
         
-        # Save model
-        torch.save(self.model.state_dict(), f"{save_dir}/intent_model.pt")
+        # Save model (unwrap torch.compile so state dict keys stay loadable)
+        model = getattr(self.model, '_orig_mod', self.model)
+        torch.save(model.state_dict(), f"{save_dir}/intent_model.pt")
         
         # Save label encoder
         with open(f"{save_dir}/label_encoder.pkl", 'wb') as f:
@@ -294,10 +462,293 @@ class IntentClassificationEngine:
         
         # Initialize and load model
         self.model = IntentClassifier(config['n_classes'], config['model_name']).to(self.device)
-        self.model.load_state_dict(torch.load(f"{save_dir}/intent_model.pt", map_location=self.device))
+        
+        # Memory-map the weights so several worker processes share one copy
+        # through the OS page cache instead of each holding its own
+        weights_path = f"{save_dir}/intent_model.pt"
+        try:
+            state_dict = torch.load(weights_path, map_location='cpu', mmap=True)
+        except (TypeError, RuntimeError):
+            # Older PyTorch or a legacy (non-zipfile) checkpoint
+            state_dict = torch.load(weights_path, map_location='cpu')
+        
+        if self.device.type == 'cpu':
+            self.model.load_state_dict(state_dict, assign=True)
+        else:
+            self.model.load_state_dict(state_dict)
         self.model.eval()
         
         print(f"Model loaded from {save_dir}")
+    
+    def get_model_info(self) -> Dict:
+        """Describe the loaded model (name, input length, device and intent labels)"""
+        intents = self.label_encoder.classes_.tolist() if self.label_encoder else []
+        return {
+            'model_name': self.model_name,
+            'max_length': self.max_length,
+            'device': str(self.device),
+            'intents': intents
+        }
+    
+    def optimize_for_inference(self, mode: str = "reduce-overhead", quantize: bool = True):
+        """
+        Prepare the loaded model for faster per-request inference
+        
+        Casts to FP16 on GPU and fuses the BERT attention layers (see
+        fuse_attention); on CPU, optionally applies dynamic INT8
+        quantization to the Linear layers (roughly a quarter of the FP32
+        weight memory and faster matmuls), or without it, Intel Extension
+        for PyTorch's optimizations when that package is installed. Then
+        wraps the model with torch.compile (PyTorch 2.x). Compilation happens
+        on the first forward pass, so a warm-up prediction runs here. Without
+        torch.compile, or if
+        it fails, the model is traced and frozen with TorchScript instead;
+        if that fails too the eager model is kept.
+        
+        Args:
+            mode: torch.compile mode
+            quantize: Quantize Linear layers to INT8 when running on CPU
+        """
+        if self.device.type == 'cuda':
+            self.model = self.model.half()
+            self.fuse_attention()
+        elif quantize:
+            self.model = torch.quantization.quantize_dynamic(
+                self.model, {nn.Linear}, dtype=torch.qint8
+            )
+            print("Model quantized to INT8 (dynamic, Linear layers)")
+        else:
+            try:
+                import intel_extension_for_pytorch as ipex
+                self.model = ipex.optimize(self.model)
+                print("Model optimized with Intel Extension for PyTorch")
+            except ImportError:
+                pass
+        
+        if not hasattr(torch, 'compile'):
+            self.trace_model()
+            return
+        
+        eager_model = self.model
+        try:
+            self.model = torch.compile(eager_model, mode=mode, fullgraph=False)
+            self.predict("hello", return_confidence=True)
+            print(f"Model compiled with torch.compile (mode={mode})")
+        except Exception as e:
+            print(f"Warning: torch.compile failed, trying TorchScript: {e}")
+            self.model = eager_model
+            self.trace_model()
+    
+    def fuse_attention(self):
+        """
+        Swap the BERT encoder layers for BetterTransformer's fused kernels
+        
+        Each layer becomes one fused op using scaled-dot-product attention
+        (Flash/memory-efficient kernels on GPU), for inference only. Needs
+        the optional optimum package; without it the model is unchanged.
+        Not combined with INT8 quantization, since the fused layers no longer
+        contain the Linear modules it replaces.
+        """
+        try:
+            from optimum.bettertransformer import BetterTransformer
+        except ImportError:
+            return
+        
+        try:
+            self.model.bert = BetterTransformer.transform(self.model.bert, keep_original_model=False)
+            print("BERT attention fused with BetterTransformer")
+        except Exception as e:
+            print(f"Warning: BetterTransformer failed, keeping standard attention: {e}")
+    
+    def trace_model(self):
+        """
+        Replace the model with a frozen TorchScript trace (kept eager on failure)
+        
+        The trace is recorded at max_length, so predictions on a traced
+        model pad every input to max_length.
+        """
+        eager_model = self.model
+        dummy = self.tokenizer(["hello"], max_length=self.max_length,
+                               padding='max_length', return_tensors='pt')
+        inputs = (dummy['input_ids'].to(self.device), dummy['attention_mask'].to(self.device))
+        try:
+            with torch.no_grad():
+                traced = torch.jit.freeze(torch.jit.trace(eager_model.eval(), inputs))
+                # Warm-up runs (the profiling executor optimizes on the first calls)
+                for _ in range(2):
+                    traced(*inputs)
+            self.model = traced
+            print("Model traced with TorchScript")
+        except Exception as e:
+            print(f"Warning: TorchScript tracing failed, using eager model: {e}")
+            self.model = eager_model
+    
+    def export_onnx(self, onnx_path: str, optimize: bool = True):
+        """
+        Export the loaded model to ONNX for use with OnnxIntentPredictor
+        
+        Export before optimize_for_inference (quantized or compiled models
+        don't export). Batch and sequence length stay dynamic. With
+        onnxruntime installed and optimize set, the graph is rewritten with
+        fused BERT attention, LayerNorm and GELU, and converted to FP16 when
+        a GPU is available.
+        
+        Args:
+            onnx_path: Output .onnx file
+            optimize: Apply onnxruntime's BERT graph optimizations
+        """
+        model = getattr(self.model, '_orig_mod', self.model)
+        model.eval()
+        
+        dummy = self.tokenizer(["hello"], return_tensors='pt')
+        torch.onnx.export(
+            model,
+            (dummy['input_ids'].to(self.device), dummy['attention_mask'].to(self.device)),
+            onnx_path,
+            opset_version=17,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'logits': {0: 'batch'}
+            }
+        )
+        print(f"Model exported to {onnx_path}")
+        
+        if not optimize:
+            return
+        
+        try:
+            from onnxruntime.transformers.optimizer import optimize_model
+        except ImportError:
+            print("onnxruntime not installed; keeping the unoptimized ONNX graph")
+            return
+        
+        use_gpu = self.device.type == 'cuda'
+        config = model.bert.config
+        optimized = optimize_model(
+            onnx_path,
+            model_type='bert',
+            num_heads=config.num_attention_heads,
+            hidden_size=config.hidden_size,
+            use_gpu=use_gpu,
+            opt_level=99 if use_gpu else 1
+        )
+        if use_gpu:
+            optimized.convert_float_to_float16()
+        optimized.save_model_to_file(onnx_path)
+        print(f"ONNX graph optimized{' (FP16)' if use_gpu else ''}")
+
+
+class OnnxIntentPredictor:
+    """
+    Intent prediction with ONNX Runtime instead of PyTorch
+    
+    Serves a model exported with IntentClassificationEngine.export_onnx,
+    using the label encoder and config saved alongside the weights. Offers
+    the same predict / predict_batch interface as the engine. Needs the
+    onnxruntime package (onnxruntime-gpu for CUDA).
+    """
+    
+    def __init__(self, onnx_path: str, save_dir: str):
+        """
+        Args:
+            onnx_path: Exported .onnx file
+            save_dir: Saved model directory (label encoder and config)
+        """
+        import onnxruntime as ort
+        
+        with open(f"{save_dir}/config.pkl", 'rb') as f:
+            config = pickle.load(f)
+        with open(f"{save_dir}/label_encoder.pkl", 'rb') as f:
+            self.label_encoder = pickle.load(f)
+        
+        self.model_name = config['model_name']
+        self.max_length = config['max_length']
+        self.tokenizer = BertTokenizerFast.from_pretrained(self.model_name)
+        
+        providers = [p for p in ('CUDAExecutionProvider', 'CPUExecutionProvider')
+                     if p in ort.get_available_providers()]
+        self.session = ort.InferenceSession(onnx_path, providers=providers)
+        print(f"ONNX model loaded from {onnx_path} ({self.session.get_providers()[0]})")
+    
+    def predict(self, text: str, return_confidence: bool = False) -> str or Tuple[str, float]:
+        """Predict intent for a single text"""
+        predicted_label, confidence = self.predict_batch([text])[0]
+        
+        if return_confidence:
+            return predicted_label, confidence
+        else:
+            return predicted_label
+    
+    def predict_batch(self, texts: List[str], batch_size: int = 32) -> List[Tuple[str, float]]:
+        """Predict intents with confidence scores for several texts"""
+        texts = list(texts)
+        results = []
+        
+        for start in range(0, len(texts), batch_size):
+            encoding = self.tokenizer(
+                texts[start:start + batch_size],
+                add_special_tokens=True,
+                max_length=self.max_length,
+                padding='longest',
+                truncation=True,
+                return_attention_mask=True,
+                return_tensors='np'
+            )
+            logits = self.session.run(None, {
+                'input_ids': encoding['input_ids'].astype(np.int64),
+                'attention_mask': encoding['attention_mask'].astype(np.int64)
+            })[0].astype(np.float32)
+            
+            # Softmax, shifted by the row max for stability
+            exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probabilities = exp / exp.sum(axis=1, keepdims=True)
+            
+            predicted = probabilities.argmax(axis=1)
+            labels = self.label_encoder.classes_[predicted]
+            results.extend(zip(labels, probabilities[np.arange(len(predicted)), predicted].tolist()))
+        
+        return results
+
+
+# Process-pool inference: each worker process holds its own engine, set up by
+# init_inference_worker and used through the worker_* functions
+_worker_engine = None
+
+
+def init_inference_worker(model_dirs: List[str], quantize: bool = True, num_threads: int = 1):
+    """
+    Load the first loadable model directory into this worker process
+    
+    Args:
+        model_dirs: Saved model directories, in order of preference
+        quantize: Quantize Linear layers to INT8 when running on CPU
+        num_threads: Torch intra-op threads for this process
+    """
+    global _worker_engine
+    torch.set_num_threads(num_threads)
+    
+    engine = IntentClassificationEngine()
+    for i, model_dir in enumerate(model_dirs):
+        try:
+            engine.load_model(model_dir)
+            break
+        except Exception:
+            if i == len(model_dirs) - 1:
+                raise
+    
+    engine.optimize_for_inference(quantize=quantize)
+    _worker_engine = engine
+
+
+def worker_predict_batch(texts: List[str]) -> List[Tuple[str, float]]:
+    return _worker_engine.predict_batch(texts)
+
+
+def worker_model_info() -> Dict:
+    return _worker_engine.get_model_info()
 
 
 if __name__ == "__main__":
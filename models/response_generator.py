@@ -58,15 +58,17 @@ class ResponseGenerator:
             inputs = self.tokenizer(input_text, return_tensors="pt", 
                                    max_length=512, truncation=True).to(self.device)
             
-            # Generate
-            with torch.no_grad():
+            # Generate (reusing cached decoder key/values at each step)
+            with torch.inference_mode():
                 outputs = self.model.generate(
-                    inputs["input_ids"],
-                    max_length=max_length,
+                    **inputs,
+                    max_new_tokens=max_length,
                     temperature=temperature,
                     do_sample=True,
                     top_p=0.9,
-                    pad_token_id=self.tokenizer.eos_token_id
+                    no_repeat_ngram_size=3,
+                    use_cache=True,
+                    pad_token_id=self.tokenizer.pad_token_id
                 )
             
             response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
@@ -155,13 +157,20 @@ class HybridResponseEngine:
         """
         self.template_responder = TemplateBasedResponder(responses_dict)
         self.use_generative = use_generative
-        
-        if use_generative:
+        # Loaded on the first generative fallback; most traffic is served
+        # by templates and never needs the model in memory
+        self._gen = None
+    
+    @property
+    def generative_responder(self) -> Optional[ResponseGenerator]:
+        """Generative model, loaded on first access (None if it can't be loaded)"""
+        if self._gen is None and self.use_generative:
             try:
-                self.generative_responder = ResponseGenerator()
+                self._gen = ResponseGenerator()
             except Exception as e:
                 print(f"Warning: Could not load generative model: {e}")
                 self.use_generative = False
+        return self._gen
     
     def generate_response(self, user_input: str, intent: str, 
                          confidence: float, context: Optional[Dict] = None) -> str:
@@ -182,7 +191,7 @@ class HybridResponseEngine:
             return self.template_responder.get_response(intent, context)
         
         # Use generative for low-confidence or unknown intents
-        elif self.use_generative:
+        elif self.use_generative and self.generative_responder is not None:
             context_str = f"Intent: {intent}. " if intent else ""
             return self.generative_responder.generate_response(user_input, context_str)
         
@@ -192,14 +201,14 @@ class HybridResponseEngine:
     
     def get_conversation_history(self) -> List[Dict]:
         """Get conversation history from generative responder"""
-        if self.use_generative:
-            return self.generative_responder.get_history()
+        if self._gen is not None:
+            return self._gen.get_history()
         return []
     
     def clear_history(self):
         """Clear conversation history"""
-        if self.use_generative:
-            self.generative_responder.clear_history()
+        if self._gen is not None:
+            self._gen.clear_history()
 
 
 if __name__ == "__main__":
@@ -4,8 +4,9 @@ Defines the base class for all personas (Friend, Counselor, Doctor)
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 import random
+import re
 
 
 class BasePersona(ABC):
@@ -28,6 +29,20 @@ class BasePersona(ABC):
         """Generate a response based on user input and intent"""
         pass
     
+    def generate_response_stream(self, user_input: str, intent: str,
+                                 confidence: float, context: Optional[Dict] = None) -> Iterator[str]:
+        """
+        Generate a response as a sequence of text chunks
+        
+        Responses are template based and complete at once, so by default
+        the full response is produced and yielded word by word (each chunk
+        keeps its trailing whitespace, so the chunks join back exactly).
+        Personas with incremental generation can override this.
+        """
+        response = self.generate_response(user_input, intent, confidence, context)
+        for match in re.finditer(r'\s*\S+\s*', response):
+            yield match.group()
+    
     @abstractmethod
     def get_persona_style(self) -> Dict:
         """Get the persona's communication style parameters"""
@@ -102,6 +117,47 @@ class FriendPersona(BasePersona):
             'tone': 'warm and friendly'
         }
     
+        # Intent-based responses (built once, not per message)
+        self.intent_responses = {
+            'sad': [
+                "I'm really sorry you're feeling this way. Want to talk about it? I'm here for you. 💙",
+                "That sounds really tough. I'm here to listen, no judgment. What's been going on?",
+                "I can hear that you're going through a hard time. You don't have to face this alone."
+            ],
+            'stressed': [
+                "Hey, super stressed from work? I feel you. What parts of your day feel most overwhelming?",
+                "Wow, that sounds overwhelming. Take a deep breath with me. Want to talk through it?",
+                "Stress is so tough. What's been weighing on you the most?",
+                "I hear you. Sometimes everything feels like too much. Let's break it down together.",
+                "Oh man, stress is no joke. What's your go-to for when things get intense? Coffee? Walk? Let's figure this out together."
+            ],
+            'anxious': [
+                "Anxiety can feel so scary. I'm here with you. What's making you feel anxious?",
+                "Those anxious feelings are real, and they're valid. Want to share what's on your mind?",
+                "I understand how unsettling anxiety can be. You're not alone in this."
+            ],
+            'happy': [
+                "That's awesome! I'm so glad you're feeling good! 😊",
+                "Yay! I love hearing that! What's making you happy?",
+                "That's wonderful! Tell me more about what's going well!"
+            ],
+            'thanks': [
+                "Of course! That's what friends are for! 💙",
+                "Anytime! I'm always here when you need someone to talk to.",
+                "You're so welcome! I'm glad I could help."
+            ],
+            'goodbye': [
+                "Take care of yourself! I'm here whenever you need me. 💙",
+                "See you soon! Remember, I'm just a message away.",
+                "Bye for now! Hope things get better. Talk soon!"
+            ],
+            'greeting': [
+                "Hey! Good to hear from you! How are you doing today? 😊",
+                "Hi there! What's been going on with you?",
+                "Hello! I'm here for you. What's on your mind?"
+            ]
+        }
+    
     def generate_greeting(self) -> str:
         return random.choice(self.greetings)
     
@@ -178,49 +234,8 @@ class FriendPersona(BasePersona):
                 "Thank you for sharing that with me. You're not alone. What's been troubling you?"
             ])
         
-        # Intent-based responses
-        friend_responses = {
-            'sad': [
-                "I'm really sorry you're feeling this way. Want to talk about it? I'm here for you. 💙",
-                "That sounds really tough. I'm here to listen, no judgment. What's been going on?",
-                "I can hear that you're going through a hard time. You don't have to face this alone."
-            ],
-            'stressed': [
-                "Hey, super stressed from work? I feel you. What parts of your day feel most overwhelming?",
-                "Wow, that sounds overwhelming. Take a deep breath with me. Want to talk through it?",
-                "Stress is so tough. What's been weighing on you the most?",
-                "I hear you. Sometimes everything feels like too much. Let's break it down together.",
-                "Oh man, stress is no joke. What's your go-to for when things get intense? Coffee? Walk? Let's figure this out together."
-            ],
-            'anxious': [
-                "Anxiety can feel so scary. I'm here with you. What's making you feel anxious?",
-                "Those anxious feelings are real, and they're valid. Want to share what's on your mind?",
-                "I understand how unsettling anxiety can be. You're not alone in this."
-            ],
-            'happy': [
-                "That's awesome! I'm so glad you're feeling good! 😊",
-                "Yay! I love hearing that! What's making you happy?",
-                "That's wonderful! Tell me more about what's going well!"
-            ],
-            'thanks': [
-                "Of course! That's what friends are for! 💙",
-                "Anytime! I'm always here when you need someone to talk to.",
-                "You're so welcome! I'm glad I could help."
-            ],
-            'goodbye': [
-                "Take care of yourself! I'm here whenever you need me. 💙",
-                "See you soon! Remember, I'm just a message away.",
-                "Bye for now! Hope things get better. Talk soon!"
-            ],
-            'greeting': [
-                "Hey! Good to hear from you! How are you doing today? 😊",
-                "Hi there! What's been going on with you?",
-                "Hello! I'm here for you. What's on your mind?"
-            ]
-        }
-        
-        if intent in friend_responses:
-            response = random.choice(friend_responses[intent])
+        if intent in self.intent_responses:
+            response = random.choice(self.intent_responses[intent])
         else:
             # Contextual generic responses
             if len(self.conversation_history) > 2:
@@ -120,56 +120,8 @@ class CounselorPersona(BasePersona):
             )
         }
     
-    def generate_greeting(self) -> str:
-        return random.choice(self.greetings)
-    
-    def suggest_videos(self, topic: str) -> List[Dict]:
-        """
-        Suggest relevant video resources based on topic
-        
-        Args:
-            topic: Mental health topic (anxiety, depression, stress, etc.)
-        
-        Returns:
-            List of video recommendations
-        """
-        topic_lower = topic.lower()
-        
-        # Find matching videos
-        if topic_lower in self.video_resources:
-            return self.video_resources[topic_lower]
-        
-        # Return general resources if no specific match
-        return self.video_resources['general']
-    
-    def format_video_recommendations(self, videos: List[Dict]) -> str:
-        """Format video recommendations as a string"""
-        if not videos:
-            return ""
-        
-        message = "\n\nI'd like to recommend some helpful resources:\n"
-        for i, video in enumerate(videos, 1):
-            message += f"\n{i}. {video['title']} ({video['duration']})"
-            message += f"\n   {video['description']}"
-        
-        message += "\n\nWould you like to explore any of these resources?"
-        return message
-    
-    def get_cbt_technique(self, technique: str) -> str:
-        """Get a specific CBT technique suggestion"""
-        return self.cbt_techniques.get(technique, "")
-    
-    def generate_response(self, user_input: str, intent: str, 
-                         confidence: float, context: Optional[Dict] = None) -> str:
-        # Check for crisis
-        if self.detect_crisis(user_input):
-            crisis_response = self.get_crisis_response()
-            crisis_response += "\n\nI'm a chatbot and cannot provide emergency support. " \
-                             "Please contact emergency services or a crisis helpline immediately."
-            return crisis_response
-        
-        # Intent-based therapeutic responses
-        counselor_responses = {
+        # Intent-based therapeutic responses (built once, not per message)
+        self.intent_responses = {
             'greeting': [
                 "Hello. I'm here to support you. What brings you here today?",
                 "Good to see you. How have you been feeling?",
@@ -270,10 +222,58 @@ class CounselorPersona(BasePersona):
                 "Professional therapy can be very beneficial. In the meantime, let's work on some coping strategies you can use. What's your main concern right now?"
             ]
         }
+    
+    def generate_greeting(self) -> str:
+        return random.choice(self.greetings)
+    
+    def suggest_videos(self, topic: str) -> List[Dict]:
+        """
+        Suggest relevant video resources based on topic
+        
+        Args:
+            topic: Mental health topic (anxiety, depression, stress, etc.)
+        
+        Returns:
+            List of video recommendations
+        """
+        topic_lower = topic.lower()
+        
+        # Find matching videos
+        if topic_lower in self.video_resources:
+            return self.video_resources[topic_lower]
+        
+        # Return general resources if no specific match
+        return self.video_resources['general']
+    
+    def format_video_recommendations(self, videos: List[Dict]) -> str:
+        """Format video recommendations as a string"""
+        if not videos:
+            return ""
+        
+        message = "\n\nI'd like to recommend some helpful resources:\n"
+        for i, video in enumerate(videos, 1):
+            message += f"\n{i}. {video['title']} ({video['duration']})"
+            message += f"\n   {video['description']}"
+        
+        message += "\n\nWould you like to explore any of these resources?"
+        return message
+    
+    def get_cbt_technique(self, technique: str) -> str:
+        """Get a specific CBT technique suggestion"""
+        return self.cbt_techniques.get(technique, "")
+    
+    def generate_response(self, user_input: str, intent: str, 
+                         confidence: float, context: Optional[Dict] = None) -> str:
+        # Check for crisis
+        if self.detect_crisis(user_input):
+            crisis_response = self.get_crisis_response()
+            crisis_response += "\n\nI'm a chatbot and cannot provide emergency support. " \
+                             "Please contact emergency services or a crisis helpline immediately."
+            return crisis_response
         
         # Generate response
-        if intent in counselor_responses:
-            response = random.choice(counselor_responses[intent])
+        if intent in self.intent_responses:
+            response = random.choice(self.intent_responses[intent])
         else:
             # Improved generic therapeutic responses based on common patterns
             if any(word in user_input.lower() for word in ['work', 'job', 'workplace', 'office', 'career']):
@@ -154,6 +154,90 @@ class DoctorPersona(BasePersona):
             }
         }
     
+        # Intent-based clinical responses (built once, not per message)
+        self.intent_responses = {
+            'fact-1': [
+                "Mental health refers to cognitive, behavioral, and emotional well-being. It encompasses "
+                "how we think, feel, and act. Good mental health enables people to realize their potential, "
+                "cope with normal life stresses, work productively, and contribute to their community."
+            ],
+            'fact-2': [
+                "Mental health is crucial for overall health and quality of life. It affects how we handle "
+                "stress, relate to others, and make decisions. Poor mental health increases risk for chronic "
+                "physical conditions like cardiovascular disease. Maintaining good mental health involves "
+                "emotional, psychological, and social well-being."
+            ],
+            'fact-3': [
+                self.provide_clinical_info('depression')
+            ],
+            'fact-5': [
+                "For a clinical diagnosis of Major Depressive Disorder, symptoms must persist for at least "
+                "two weeks and represent a change from previous functioning. Five or more of the following "
+                "must be present: depressed mood, diminished interest/pleasure, weight changes, sleep "
+                "disturbances, psychomotor changes, fatigue, feelings of worthlessness, concentration "
+                "difficulties, or recurrent thoughts of death. A thorough evaluation by a qualified mental "
+                "health professional is necessary for accurate diagnosis."
+            ],
+            'fact-8': [
+                "Mental illnesses are medical conditions involving changes in emotion, thinking, or behavior "
+                "(or a combination). They are associated with distress and impaired functioning in social, "
+                "work, or family activities. Mental illnesses are brain disorders with biological, genetic, "
+                "and environmental factors. They are NOT character flaws or signs of personal weakness. "
+                "With proper treatment, 70-90% of individuals experience significant symptom reduction."
+            ],
+            'sad': [
+                "Persistent sadness lasting more than two weeks may indicate depression, which requires "
+                "clinical evaluation. I recommend documenting your symptoms (duration, intensity, impact on "
+                "functioning) and scheduling an appointment with a mental health professional. Early "
+                "intervention improves outcomes."
+            ],
+            'depressed': [
+                "If you're experiencing depressive symptoms, clinical evaluation is important. " +
+                self.provide_clinical_info('depression') +
+                "\n\nI strongly recommend consulting with a psychiatrist or psychologist for proper assessment "
+                "and treatment planning."
+            ],
+            'anxious': [
+                "Anxiety symptoms warrant clinical attention, especially if they interfere with daily "
+                "functioning. " + self.provide_clinical_info('anxiety') +
+                "\n\nA mental health professional can provide accurate diagnosis and evidence-based treatment."
+            ],
+            'stressed': [
+                "Chronic stress can have serious health consequences. Based on privacy-preserving simulations, implementing structured breaks and boundary-setting strategies may help. " + self.provide_clinical_info('stress') +
+                "\n\nConsider consulting a healthcare provider to rule out underlying medical conditions and "
+                "develop a comprehensive stress management plan."
+            ],
+            'work_tired': [
+                "Chronic work-related fatigue warrants clinical evaluation. Privacy-preserving simulations from similar professional profiles suggest that persistent tiredness may indicate underlying conditions requiring assessment. Document your sleep patterns, energy levels, and work hours for clinical review. How long has this fatigue been ongoing?"
+            ],
+            'burnout': [
+                "Burnout symptoms align with exhaustion from prolonged demands, often seen in STEM fields. Our privacy-preserving simulations indicate weekly commitments, such as exercise routines, may improve resilience scores by 20-30% in similar profiles. This isn't medical advice – consider professional evaluation if fatigue persists. How long has this been ongoing?",
+                
+                "Clinical research shows burnout is characterized by emotional exhaustion, depersonalization, and reduced personal accomplishment. Privacy-preserving analysis of comparable professional cohorts suggests structured interventions including cognitive-behavioral approaches and lifestyle modifications show 25-35% improvement in resilience metrics over 8-12 weeks. Professional evaluation is recommended for persistent symptoms exceeding 3 months. What is your primary occupation?",
+                
+                "Burnout in high-demand professions demonstrates measurable impacts on cognitive function and physical health. Privacy-preserving data from similar demographic profiles indicates multimodal interventions may improve recovery trajectories. However, this is informational only – consult with a healthcare provider for personalized assessment. When did symptoms first appear?"
+            ],
+            'sleep': [
+                "Sleep disturbances are often comorbid with mental health conditions. Poor sleep can exacerbate "
+                "depression and anxiety, while these conditions can disrupt sleep. Medical evaluation is "
+                "recommended to rule out sleep disorders (sleep apnea, restless leg syndrome) and address "
+                "any underlying mental health conditions."
+            ],
+            'medication': [
+                "Psychiatric medications work by altering brain chemistry. Common classes include:\n\n" +
+                self.explain_treatment('SSRIs', 'medication_types') + "\n" +
+                self.explain_treatment('SNRIs', 'medication_types') + "\n\n" +
+                "Medications should only be prescribed by a qualified physician after thorough evaluation. "
+                "They often work best in combination with psychotherapy."
+            ],
+            'help': [
+                "I can provide clinical information about mental health conditions, symptoms, and treatment "
+                "options. However, I cannot diagnose conditions or prescribe treatment. For personalized care, "
+                "please consult with a licensed mental health professional. How can I assist you with mental "
+                "health information today?"
+            ]
+        }
+    
     def generate_greeting(self) -> str:
         return random.choice(self.greetings)
     
@@ -239,93 +323,9 @@ class DoctorPersona(BasePersona):
                              "the nearest emergency room immediately."
             return crisis_response
         
-        # Intent-based clinical responses
-        doctor_responses = {
-            'fact-1': [
-                "Mental health refers to cognitive, behavioral, and emotional well-being. It encompasses "
-                "how we think, feel, and act. Good mental health enables people to realize their potential, "
-                "cope with normal life stresses, work productively, and contribute to their community."
-            ],
-            'fact-2': [
-                "Mental health is crucial for overall health and quality of life. It affects how we handle "
-                "stress, relate to others, and make decisions. Poor mental health increases risk for chronic "
-                "physical conditions like cardiovascular disease. Maintaining good mental health involves "
-                "emotional, psychological, and social well-being."
-            ],
-            'fact-3': [
-                self.provide_clinical_info('depression')
-            ],
-            'fact-5': [
-                "For a clinical diagnosis of Major Depressive Disorder, symptoms must persist for at least "
-                "two weeks and represent a change from previous functioning. Five or more of the following "
-                "must be present: depressed mood, diminished interest/pleasure, weight changes, sleep "
-                "disturbances, psychomotor changes, fatigue, feelings of worthlessness, concentration "
-                "difficulties, or recurrent thoughts of death. A thorough evaluation by a qualified mental "
-                "health professional is necessary for accurate diagnosis."
-            ],
-            'fact-8': [
-                "Mental illnesses are medical conditions involving changes in emotion, thinking, or behavior "
-                "(or a combination). They are associated with distress and impaired functioning in social, "
-                "work, or family activities. Mental illnesses are brain disorders with biological, genetic, "
-                "and environmental factors. They are NOT character flaws or signs of personal weakness. "
-                "With proper treatment, 70-90% of individuals experience significant symptom reduction."
-            ],
-            'sad': [
-                "Persistent sadness lasting more than two weeks may indicate depression, which requires "
-                "clinical evaluation. I recommend documenting your symptoms (duration, intensity, impact on "
-                "functioning) and scheduling an appointment with a mental health professional. Early "
-                "intervention improves outcomes."
-            ],
-            'depressed': [
-                "If you're experiencing depressive symptoms, clinical evaluation is important. " +
-                self.provide_clinical_info('depression') +
-                "\n\nI strongly recommend consulting with a psychiatrist or psychologist for proper assessment "
-                "and treatment planning."
-            ],
-            'anxious': [
-                "Anxiety symptoms warrant clinical attention, especially if they interfere with daily "
-                "functioning. " + self.provide_clinical_info('anxiety') +
-                "\n\nA mental health professional can provide accurate diagnosis and evidence-based treatment."
-            ],
-            'stressed': [
-                "Chronic stress can have serious health consequences. Based on privacy-preserving simulations, implementing structured breaks and boundary-setting strategies may help. " + self.provide_clinical_info('stress') +
-                "\n\nConsider consulting a healthcare provider to rule out underlying medical conditions and "
-                "develop a comprehensive stress management plan."
-            ],
-            'work_tired': [
-                "Chronic work-related fatigue warrants clinical evaluation. Privacy-preserving simulations from similar professional profiles suggest that persistent tiredness may indicate underlying conditions requiring assessment. Document your sleep patterns, energy levels, and work hours for clinical review. How long has this fatigue been ongoing?"
-            ],
-            'burnout': [
-                "Burnout symptoms align with exhaustion from prolonged demands, often seen in STEM fields. Our privacy-preserving simulations indicate weekly commitments, such as exercise routines, may improve resilience scores by 20-30% in similar profiles. This isn't medical advice – consider professional evaluation if fatigue persists. How long has this been ongoing?",
-                
-                "Clinical research shows burnout is characterized by emotional exhaustion, depersonalization, and reduced personal accomplishment. Privacy-preserving analysis of comparable professional cohorts suggests structured interventions including cognitive-behavioral approaches and lifestyle modifications show 25-35% improvement in resilience metrics over 8-12 weeks. Professional evaluation is recommended for persistent symptoms exceeding 3 months. What is your primary occupation?",
-                
-                "Burnout in high-demand professions demonstrates measurable impacts on cognitive function and physical health. Privacy-preserving data from similar demographic profiles indicates multimodal interventions may improve recovery trajectories. However, this is informational only – consult with a healthcare provider for personalized assessment. When did symptoms first appear?"
-            ],
-            'sleep': [
-                "Sleep disturbances are often comorbid with mental health conditions. Poor sleep can exacerbate "
-                "depression and anxiety, while these conditions can disrupt sleep. Medical evaluation is "
-                "recommended to rule out sleep disorders (sleep apnea, restless leg syndrome) and address "
-                "any underlying mental health conditions."
-            ],
-            'medication': [
-                "Psychiatric medications work by altering brain chemistry. Common classes include:\n\n" +
-                self.explain_treatment('SSRIs', 'medication_types') + "\n" +
-                self.explain_treatment('SNRIs', 'medication_types') + "\n\n" +
-                "Medications should only be prescribed by a qualified physician after thorough evaluation. "
-                "They often work best in combination with psychotherapy."
-            ],
-            'help': [
-                "I can provide clinical information about mental health conditions, symptoms, and treatment "
-                "options. However, I cannot diagnose conditions or prescribe treatment. For personalized care, "
-                "please consult with a licensed mental health professional. How can I assist you with mental "
-                "health information today?"
-            ]
-        }
-        
         # Generate response
-        if intent in doctor_responses:
-            response = random.choice(doctor_responses[intent])
+        if intent in self.intent_responses:
+            response = random.choice(self.intent_responses[intent])
         else:
             # Generic clinical responses
             generic = [
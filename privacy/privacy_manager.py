@@ -3,12 +3,32 @@ Privacy-Preserving Mechanisms
 Implements differential privacy and data anonymization
 """
 
+import asyncio
 import hashlib
 import uuid
-from typing import Dict, List, Any, Optional
+from array import array
+from collections import Counter, deque
+from itertools import chain, islice
+from typing import Dict, Iterable, List, Any, Optional
 from datetime import datetime
 import json
 import re
+import numpy as np
+
+
+# PII patterns, compiled once at import
+PII_PATTERNS = {
+    'email': re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+    'phone': re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'),
+    'ssn': re.compile(r'\b\d{3}-\d{2}-\d{4}\b'),
+    'url': re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'),
+    'ip_address': re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b'),
+    'credit_card': re.compile(r'\b(?:\d{4}[-\s]?){3}\d{4}\b')
+}
+
+# Every PII pattern needs a digit, an '@' or a URL scheme, so text without
+# any of them can skip the per-pattern scans
+PII_HINT_PATTERN = re.compile(r'[\d@]|http')
 
 
 class DifferentialPrivacy:
@@ -38,11 +58,27 @@ class DifferentialPrivacy:
         Returns:
             Noisy value
         """
-        import numpy as np
         scale = sensitivity / self.epsilon
         noise = np.random.laplace(0, scale)
         return value + noise
     
+    def add_laplace_noise_array(self, values: np.ndarray, sensitivity: float,
+                                epsilon: Optional[float] = None) -> np.ndarray:
+        """
+        Add independent Laplace noise to every element of an array
+        
+        Args:
+            values: Original values
+            sensitivity: L1 sensitivity of the whole array
+            epsilon: Budget spent on this release (defaults to self.epsilon)
+        
+        Returns:
+            Noisy values (float64)
+        """
+        scale = sensitivity / (epsilon or self.epsilon)
+        values = np.asarray(values, dtype=np.float64)
+        return values + np.random.laplace(0, scale, size=values.shape)
+    
     def add_gaussian_noise(self, value: float, sensitivity: float) -> float:
         """
         Add Gaussian noise for (ε, δ)-differential privacy
@@ -54,7 +90,6 @@ class DifferentialPrivacy:
         Returns:
             Noisy value
         """
-        import numpy as np
         sigma = (sensitivity * np.sqrt(2 * np.log(1.25 / self.delta))) / self.epsilon
         noise = np.random.normal(0, sigma)
         return value + noise
@@ -71,12 +106,16 @@ class DifferentialPrivacy:
         Returns:
             Noisy statistics
         """
-        noisy_stats = {}
-        for key, value in statistics.items():
-            if isinstance(value, (int, float)):
-                noisy_stats[key] = self.add_laplace_noise(float(value), sensitivity)
-            else:
-                noisy_stats[key] = value
+        noisy_stats = dict(statistics)
+        numeric_keys = [key for key, value in statistics.items()
+                        if isinstance(value, (int, float))]
+        
+        # One vectorized draw for all numeric statistics
+        if numeric_keys:
+            noisy_values = self.add_laplace_noise_array(
+                [statistics[key] for key in numeric_keys], sensitivity
+            )
+            noisy_stats.update(zip(numeric_keys, noisy_values.tolist()))
         
         return noisy_stats
 
@@ -88,14 +127,7 @@ class DataAnonymizer:
     
     def __init__(self):
         # PII patterns
-        self.patterns = {
-            'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            'phone': r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
-            'ssn': r'\b\d{3}-\d{2}-\d{4}\b',
-            'url': r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+',
-            'ip_address': r'\b(?:\d{1,3}\.){3}\d{1,3}\b',
-            'credit_card': r'\b(?:\d{4}[-\s]?){3}\d{4}\b'
-        }
+        self.patterns = PII_PATTERNS
         
         # Common names to redact (simplified list)
         self.common_names = ['john', 'jane', 'mary', 'michael', 'david', 'sarah', 
@@ -112,25 +144,28 @@ class DataAnonymizer:
         Returns:
             Anonymized text
         """
+        if not PII_HINT_PATTERN.search(text):
+            return text
+        
         anonymized = text
         
         # Replace email addresses
-        anonymized = re.sub(self.patterns['email'], '[EMAIL]', anonymized)
+        anonymized = self.patterns['email'].sub('[EMAIL]', anonymized)
         
         # Replace phone numbers
-        anonymized = re.sub(self.patterns['phone'], '[PHONE]', anonymized)
+        anonymized = self.patterns['phone'].sub('[PHONE]', anonymized)
         
         # Replace SSN
-        anonymized = re.sub(self.patterns['ssn'], '[SSN]', anonymized)
+        anonymized = self.patterns['ssn'].sub('[SSN]', anonymized)
         
         # Replace URLs
-        anonymized = re.sub(self.patterns['url'], '[URL]', anonymized)
+        anonymized = self.patterns['url'].sub('[URL]', anonymized)
         
         # Replace IP addresses
-        anonymized = re.sub(self.patterns['ip_address'], '[IP]', anonymized)
+        anonymized = self.patterns['ip_address'].sub('[IP]', anonymized)
         
         # Replace credit card numbers
-        anonymized = re.sub(self.patterns['credit_card'], '[CREDIT_CARD]', anonymized)
+        anonymized = self.patterns['credit_card'].sub('[CREDIT_CARD]', anonymized)
         
         return anonymized
     
@@ -142,9 +177,11 @@ class DataAnonymizer:
             Dictionary of detected PII types and values
         """
         detected = {}
+        if not PII_HINT_PATTERN.search(text):
+            return detected
         
         for pii_type, pattern in self.patterns.items():
-            matches = re.findall(pattern, text)
+            matches = pattern.findall(text)
             if matches:
                 detected[pii_type] = matches
         
@@ -170,8 +207,14 @@ class SessionManager:
     Manages user sessions with privacy preservation
     """
     
-    def __init__(self, use_persistent_ids: bool = False):
+    def __init__(self, use_persistent_ids: bool = False, max_history: int = 10_000):
+        """
+        Args:
+            use_persistent_ids: Keep identifiers stable across sessions
+            max_history: Messages kept per session; the oldest are dropped beyond this
+        """
         self.use_persistent_ids = use_persistent_ids
+        self.max_history = max_history
         self.sessions = {}
         self.anonymizer = DataAnonymizer()
     
@@ -196,8 +239,23 @@ class SessionManager:
             'session_id': session_id,
             'hashed_user_id': hashed_user_id,
             'created_at': datetime.now().isoformat(),
-            'conversation_history': [],
-            'metadata': {}
+            'conversation_history': deque(maxlen=self.max_history),
+            # Per-message metadata as parallel columns, for cheap scans and
+            # aggregation. Entries before column_start have left the
+            # conversation_history window and are trimmed in batches.
+            'message_columns': {
+                'persona': [],
+                'intent': [],
+                'confidence': array('f'),
+                'crisis': bytearray()
+            },
+            'column_start': 0,
+            # Running tally of the persona column, so the most used persona
+            # is read without scanning the history
+            'persona_counts': Counter(),
+            'metadata': {},
+            # Serializes writes to this session from concurrent requests
+            'lock': asyncio.Lock()
         }
         
         return session_id
@@ -212,6 +270,9 @@ class SessionManager:
             user_message: User's message
             bot_response: Bot's response
             metadata: Additional metadata
+        
+        Returns:
+            The stored message entry
         """
         if session_id not in self.sessions:
             raise ValueError(f"Session {session_id} not found")
@@ -226,42 +287,150 @@ class SessionManager:
             'metadata': metadata or {}
         }
         
-        self.sessions[session_id]['conversation_history'].append(message_entry)
+        session = self.sessions[session_id]
+        session['conversation_history'].append(message_entry)
+        
+        metadata = message_entry['metadata']
+        columns = session['message_columns']
+        persona = metadata.get('persona', 'unknown')
+        columns['persona'].append(persona)
+        session['persona_counts'][persona] += 1
+        # Model labels come back as numpy.str_; store plain str so they can
+        # be used as JSON object keys
+        columns['intent'].append(str(metadata.get('intent', 'unknown')))
+        columns['confidence'].append(metadata.get('confidence', 0.0))
+        columns['crisis'].append(1 if metadata.get('crisis_detected') else 0)
+        
+        # Keep the columns aligned with the bounded history: advance the
+        # start past the dropped message, and only trim the dead prefix
+        # once it reaches a quarter of max_history (amortized O(1))
+        start = session['column_start']
+        if len(columns['persona']) - start > self.max_history:
+            persona_counts = session['persona_counts']
+            dropped = columns['persona'][start]
+            persona_counts[dropped] -= 1
+            if persona_counts[dropped] <= 0:
+                del persona_counts[dropped]
+            start += 1
+            if start >= max(1, self.max_history // 4):
+                for column in columns.values():
+                    del column[:start]
+                start = 0
+            session['column_start'] = start
+        
+        return message_entry
     
     def get_session(self, session_id: str) -> Optional[Dict]:
         """Get session data"""
         return self.sessions.get(session_id)
     
+    def get_recent_history(self, session_id: str, limit: int) -> List[Dict]:
+        """
+        Get the last `limit` messages of a session, oldest first
+        
+        Walks the history from the newest end, so cost is O(limit) rather
+        than a copy of the whole conversation.
+        """
+        history = self.sessions[session_id]['conversation_history']
+        recent = list(islice(reversed(history), limit))
+        recent.reverse()
+        return recent
+    
+    def get_message_columns(self, session_id: str) -> Dict[str, Any]:
+        """
+        Get per-message metadata as parallel columns, oldest first
+        
+        Returns a dict of 'persona' and 'intent' (lists of str), 'confidence'
+        (array('f')) and 'crisis' (bytearray of 0/1). Treat as read-only.
+        """
+        return self._message_columns(self.sessions[session_id])
+    
+    @staticmethod
+    def _message_columns(session: Dict) -> Dict[str, Any]:
+        """The live window of a session's columns (copied only if a dead prefix is pending)"""
+        columns = session['message_columns']
+        start = session['column_start']
+        if start == 0:
+            return columns
+        return {name: column[start:] for name, column in columns.items()}
+    
+    def get_persona_counts(self, session_id: str) -> Counter:
+        """Get how many stored messages each persona answered (treat as read-only)"""
+        return self.sessions[session_id]['persona_counts']
+    
     def delete_session(self, session_id: str):
         """Delete session data"""
         if session_id in self.sessions:
             del self.sessions[session_id]
     
-    def export_aggregated_data(self, dp_mechanism: DifferentialPrivacy) -> Dict:
+    def export_aggregated_data(self, dp_mechanism: DifferentialPrivacy,
+                               intent_domain: Iterable[str] = ()) -> Dict:
         """
         Export aggregated statistics with differential privacy
         
+        Neighbouring datasets differ by one message (possibly in a session
+        of its own). Three Laplace releases are made, each with a third of
+        dp_mechanism.epsilon, so the export as a whole is epsilon-DP:
+        
+        - session, message and crisis counts plus the clipped confidence
+          sum (L1 sensitivity 4, one draw)
+        - message counts per intent over intent_domain plus 'other'
+        - the 10-bin confidence histogram
+        
+        Averages are computed from the noisy values (post-processing).
+        
         Args:
             dp_mechanism: Differential privacy mechanism
+            intent_domain: Every intent that can be recorded; each is released,
+                including zero counts, and anything else counts as 'other'
         
         Returns:
             Anonymized aggregated data
         """
-        total_sessions = len(self.sessions)
-        total_messages = sum(len(s['conversation_history']) for s in self.sessions.values())
-        
-        avg_messages_per_session = total_messages / total_sessions if total_sessions > 0 else 0
-        
-        statistics = {
+        epsilon = dp_mechanism.epsilon / 3
+        columns = [self._message_columns(s) for s in self.sessions.values()]
+        
+        confidences = np.concatenate(
+            [np.frombuffer(c['confidence'], dtype=np.float32) for c in columns]
+            or [np.empty(0, dtype=np.float32)]
+        )
+        confidences = np.clip(confidences, 0.0, 1.0)
+        crisis_messages = sum(sum(c['crisis']) for c in columns)
+        
+        total_sessions, total_messages, confidence_sum, crisis_messages = (
+            dp_mechanism.add_laplace_noise_array(
+                [len(columns), confidences.size, float(confidences.sum()), crisis_messages],
+                sensitivity=4.0, epsilon=epsilon
+            ).tolist()
+        )
+        
+        # Fixed key set, so which intents occurred is never revealed unnoised
+        intent_names = list(dict.fromkeys(map(str, intent_domain)))
+        intent_names.append('other')
+        intent_index = {name: i for i, name in enumerate(intent_names)}
+        intent_counts = np.zeros(len(intent_names), dtype=np.int64)
+        for intent, count in Counter(chain.from_iterable(c['intent'] for c in columns)).items():
+            intent_counts[intent_index.get(intent, len(intent_names) - 1)] += count
+        noisy_intent_counts = dp_mechanism.add_laplace_noise_array(
+            intent_counts, sensitivity=1.0, epsilon=epsilon
+        )
+        
+        histogram, bin_edges = np.histogram(confidences, bins=np.linspace(0.0, 1.0, 11))
+        
+        return {
             'total_sessions': total_sessions,
             'total_messages': total_messages,
-            'avg_messages_per_session': avg_messages_per_session
+            'avg_messages_per_session': total_messages / max(total_sessions, 1.0),
+            'avg_confidence': min(max(confidence_sum / max(total_messages, 1.0), 0.0), 1.0),
+            'crisis_messages': crisis_messages,
+            'intent_distribution': dict(zip(intent_names, noisy_intent_counts.tolist())),
+            'confidence_histogram': {
+                'bin_edges': bin_edges.tolist(),
+                'counts': dp_mechanism.add_laplace_noise_array(
+                    histogram, sensitivity=1.0, epsilon=epsilon
+                ).tolist()
+            }
         }
-        
-        # Apply differential privacy
-        noisy_stats = dp_mechanism.apply_noise_to_stats(statistics, sensitivity=1.0)
-        
-        return noisy_stats
 
 
 class PrivacyAudit:
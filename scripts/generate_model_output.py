@@ -5,20 +5,39 @@ Creates comprehensive output file with model predictions and analysis
 
 import sys
 import os
-import json
-import pandas as pd
-import pickle
+import csv
+import orjson
+from collections import Counter
+from functools import lru_cache
 from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from models.intent_classifier import IntentClassificationEngine
-from personas.base_persona import FriendPersona
-from personas.counselor_persona import CounselorPersona
-from personas.doctor_persona import DoctorPersona
+# The classifier (torch, transformers) and the personas are imported where
+# they are used, so importing this module stays cheap
 
 
-def generate_model_outputs(model_path: str = "models/finetuned_intent_classifier_v2"):
-    """Generate comprehensive output file from the fine-tuned model"""
+@lru_cache(maxsize=1)
+def load_classifier(model_path: str):
+    """Load the fine-tuned classifier, reusing it across calls for the same path"""
+    from models.intent_classifier import IntentClassificationEngine
+    
+    classifier = IntentClassificationEngine(model_name='bert-base-uncased', max_length=256)
+    classifier.load_model(model_path)
+    return classifier
+
+
+def generate_model_outputs(model_path: str = "models/finetuned_intent_classifier_v2",
+                           emit_pickle: bool = False):
+    """
+    Generate comprehensive output file from the fine-tuned model
+    
+    Everything runs in this process (no HTTP calls), so the test cases are
+    CPU-bound on the classifier rather than waiting on I/O.
+    
+    Args:
+        model_path: Directory of the fine-tuned model
+        emit_pickle: Also save the results as a pickle (same content as the JSON file)
+    """
     
     print("="*80)
     print(" GENERATING MODEL OUTPUT FILE")
@@ -26,17 +45,20 @@ def generate_model_outputs(model_path: str = "models/finetuned_intent_classifier
     
     # Load model
     print(f"\n[1/4] Loading model from: {model_path}")
-    classifier = IntentClassificationEngine(model_name='bert-base-uncased', max_length=256)
-    
     try:
-        classifier.load_model(model_path)
+        classifier = load_classifier(model_path)
         print("✓ Model loaded successfully")
     except Exception as e:
         print(f"❌ Error loading model: {e}")
         return
     
-    # Initialize personas
+    # Initialize personas (fresh each run: they keep conversation history,
+    # which shapes their replies)
     print("\n[2/4] Initializing personas...")
+    from personas.base_persona import FriendPersona
+    from personas.counselor_persona import CounselorPersona
+    from personas.doctor_persona import DoctorPersona
+    
     personas = {
         'Friend': FriendPersona(),
         'Counselor': CounselorPersona(),
@@ -80,16 +102,21 @@ def generate_model_outputs(model_path: str = "models/finetuned_intent_classifier
         {"input": "What is depression?", "category": "Information Seeking"},
     ]
     
+    # Get intent predictions for every test case in one forward pass
+    predictions = classifier.predict_batch([test_case["input"] for test_case in test_cases])
+    
     results = []
+    intent_distribution = Counter()
+    # Summary figures, gathered as the cases are processed
+    confidence_total = 0.0
+    high_conf = med_conf = low_conf = 0
     
-    for idx, test_case in enumerate(test_cases, 1):
+    for idx, (test_case, (intent, confidence)) in enumerate(zip(test_cases, predictions), 1):
         user_input = test_case["input"]
         category = test_case["category"]
         
-        # Get intent prediction
-        intent, confidence = classifier.predict(user_input, return_confidence=True)
-        
-        # Generate responses from each persona
+        # Generate responses from each persona (not memoized: personas pick
+        # among templates at random and take their history into account)
         responses = {}
         for persona_name, persona_obj in personas.items():
             response = persona_obj.generate_response(user_input, intent, confidence)
@@ -105,6 +132,14 @@ def generate_model_outputs(model_path: str = "models/finetuned_intent_classifier
         }
         
         results.append(result)
+        intent_distribution[intent] += 1
+        confidence_total += result["confidence"]
+        if result["confidence"] >= 70:
+            high_conf += 1
+        elif result["confidence"] >= 40:
+            med_conf += 1
+        else:
+            low_conf += 1
         print(f"  Processed {idx}/{len(test_cases)}: {category}")
     
     print("✓ All test cases processed")
@@ -125,99 +160,91 @@ def generate_model_outputs(model_path: str = "models/finetuned_intent_classifier
         },
         "results": results,
         "summary": {
-            "average_confidence": round(sum(r["confidence"] for r in results) / len(results), 2),
-            "intent_distribution": {}
+            "average_confidence": round(confidence_total / len(results), 2),
+            "intent_distribution": dict(intent_distribution)
         }
     }
     
-    # Calculate intent distribution
-    for result in results:
-        intent = result["predicted_intent"]
-        json_output["summary"]["intent_distribution"][intent] = \
-            json_output["summary"]["intent_distribution"].get(intent, 0) + 1
-    
     json_filename = f"output/model_output_{timestamp}.json"
     os.makedirs("output", exist_ok=True)
     
-    with open(json_filename, 'w', encoding='utf-8') as f:
-        json.dump(json_output, f, indent=2, ensure_ascii=False)
+    # OPT_NON_STR_KEYS: the intent labels are numpy strings
+    with open(json_filename, 'wb') as f:
+        f.write(orjson.dumps(json_output, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     print(f"✓ JSON output saved: {json_filename}")
     
-    # CSV output (flattened)
-    csv_data = []
-    for result in results:
-        row = {
-            "ID": result["id"],
-            "Category": result["category"],
-            "User Input": result["user_input"],
-            "Predicted Intent": result["predicted_intent"],
-            "Confidence (%)": result["confidence"],
-            "Friend Response": result["responses"]["Friend"],
-            "Counselor Response": result["responses"]["Counselor"],
-            "Doctor Response": result["responses"]["Doctor"]
-        }
-        csv_data.append(row)
+    # Pickle output (for Python serialization), only on request
+    pickle_filename = None
+    if emit_pickle:
+        import pickle
+        
+        pickle_filename = f"output/model_output_{timestamp}.pkl"
+        with open(pickle_filename, 'wb') as f:
+            pickle.dump(json_output, f, protocol=pickle.HIGHEST_PROTOCOL)
+        print(f"✓ Pickle output saved: {pickle_filename}")
     
-    df = pd.DataFrame(csv_data)
+    # CSV output (flattened, one row per result) and human-readable text
+    # output, written together in one pass over the results
     csv_filename = f"output/model_output_{timestamp}.csv"
-    df.to_csv(csv_filename, index=False, encoding='utf-8-sig')
-    print(f"✓ CSV output saved: {csv_filename}")
-    
-    # Pickle output (for Python serialization)
-    pickle_filename = f"output/model_output_{timestamp}.pkl"
-    with open(pickle_filename, 'wb') as f:
-        pickle.dump(json_output, f)
-    print(f"✓ Pickle output saved: {pickle_filename}")
-    
-    # Human-readable text output
     txt_filename = f"output/model_output_{timestamp}.txt"
-    with open(txt_filename, 'w', encoding='utf-8') as f:
-        f.write("="*80 + "\n")
-        f.write(" FINE-TUNED MODEL OUTPUT REPORT\n")
-        f.write("="*80 + "\n\n")
-        
-        f.write(f"Model: {model_path}\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Test Cases: {len(test_cases)}\n")
-        f.write(f"Average Confidence: {json_output['summary']['average_confidence']}%\n\n")
+    with open(csv_filename, 'w', newline='', encoding='utf-8-sig') as csv_f, \
+            open(txt_filename, 'w', encoding='utf-8') as f:
+        writer = csv.writer(csv_f)
+        writer.writerow([
+            "ID", "Category", "User Input", "Predicted Intent", "Confidence (%)",
+            "Friend Response", "Counselor Response", "Doctor Response"
+        ])
         
-        f.write("-"*80 + "\n")
-        f.write(" DETAILED RESULTS\n")
-        f.write("-"*80 + "\n\n")
+        # Each section goes to the file as one joined string
+        f.write("".join([
+            "="*80 + "\n",
+            " FINE-TUNED MODEL OUTPUT REPORT\n",
+            "="*80 + "\n\n",
+            f"Model: {model_path}\n",
+            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            f"Test Cases: {len(test_cases)}\n",
+            f"Average Confidence: {json_output['summary']['average_confidence']}%\n\n",
+            "-"*80 + "\n",
+            " DETAILED RESULTS\n",
+            "-"*80 + "\n\n"
+        ]))
         
         for result in results:
-            f.write(f"[{result['id']}] {result['category']}\n")
-            f.write(f"User Input: \"{result['user_input']}\"\n")
-            f.write(f"Predicted Intent: {result['predicted_intent']}\n")
-            f.write(f"Confidence: {result['confidence']}%\n\n")
+            writer.writerow([
+                result["id"], result["category"], result["user_input"],
+                result["predicted_intent"], result["confidence"],
+                result["responses"]["Friend"], result["responses"]["Counselor"],
+                result["responses"]["Doctor"]
+            ])
             
+            parts = [
+                f"[{result['id']}] {result['category']}\n",
+                f"User Input: \"{result['user_input']}\"\n",
+                f"Predicted Intent: {result['predicted_intent']}\n",
+                f"Confidence: {result['confidence']}%\n\n"
+            ]
             for persona_name, response in result['responses'].items():
-                f.write(f"  {persona_name} Response:\n")
-                f.write(f"  \"{response}\"\n\n")
-            
-            f.write("-"*80 + "\n\n")
-        
-        f.write("\n" + "="*80 + "\n")
-        f.write(" SUMMARY STATISTICS\n")
-        f.write("="*80 + "\n\n")
-        
-        f.write("Intent Distribution:\n")
-        for intent, count in sorted(json_output['summary']['intent_distribution'].items(), 
-                                    key=lambda x: x[1], reverse=True):
-            f.write(f"  {intent}: {count} cases\n")
+                parts.append(f"  {persona_name} Response:\n  \"{response}\"\n\n")
+            parts.append("-"*80 + "\n\n")
+            f.write("".join(parts))
         
-        f.write(f"\nAverage Confidence: {json_output['summary']['average_confidence']}%\n")
-        
-        # Confidence levels
-        high_conf = sum(1 for r in results if r['confidence'] >= 70)
-        med_conf = sum(1 for r in results if 40 <= r['confidence'] < 70)
-        low_conf = sum(1 for r in results if r['confidence'] < 40)
-        
-        f.write(f"\nConfidence Distribution:\n")
-        f.write(f"  High (≥70%): {high_conf} cases\n")
-        f.write(f"  Medium (40-70%): {med_conf} cases\n")
-        f.write(f"  Low (<40%): {low_conf} cases\n")
+        parts = [
+            "\n" + "="*80 + "\n",
+            " SUMMARY STATISTICS\n",
+            "="*80 + "\n\n",
+            "Intent Distribution:\n"
+        ]
+        parts.extend(f"  {intent}: {count} cases\n" for intent, count in intent_distribution.most_common())
+        parts.extend([
+            f"\nAverage Confidence: {json_output['summary']['average_confidence']}%\n",
+            "\nConfidence Distribution:\n",
+            f"  High (≥70%): {high_conf} cases\n",
+            f"  Medium (40-70%): {med_conf} cases\n",
+            f"  Low (<40%): {low_conf} cases\n"
+        ])
+        f.write("".join(parts))
     
+    print(f"✓ CSV output saved: {csv_filename}")
     print(f"✓ Text output saved: {txt_filename}")
     
     print("\n" + "="*80)
@@ -226,11 +253,12 @@ def generate_model_outputs(model_path: str = "models/finetuned_intent_classifier
     print(f"\n📁 Output files created in 'output/' directory:")
     print(f"   - {json_filename}")
     print(f"   - {csv_filename}")
-    print(f"   - {pickle_filename}")
+    if pickle_filename:
+        print(f"   - {pickle_filename}")
     print(f"   - {txt_filename}")
     
     return json_output
 
 
 if __name__ == "__main__":
-    generate_model_outputs()
+    generate_model_outputs(emit_pickle=os.environ.get("EMIT_PICKLE", "0") == "1")
@@ -96,6 +96,35 @@ def test_privacy():
         return False
 
 
+def test_statistics_export():
+    """Test that DP statistics serialize with model-typed (numpy) intents"""
+    print("\nTesting statistics export...")
+    try:
+        import numpy as np
+        import orjson
+        from fastapi.encoders import jsonable_encoder
+        from privacy.privacy_manager import DifferentialPrivacy, SessionManager
+        
+        manager = SessionManager()
+        session_id = manager.create_session()
+        # The trained classifier returns labels indexed from classes_ (numpy.str_)
+        manager.add_message(session_id, "hello", "Hi there!", {
+            'intent': np.array(['greeting'])[0],
+            'confidence': np.float32(0.92),
+            'persona': 'friend'
+        })
+        
+        stats = manager.export_aggregated_data(DifferentialPrivacy(epsilon=1.0),
+                                               ['greeting', 'suicide'])
+        orjson.dumps(jsonable_encoder({'statistics': stats}))
+        assert set(stats['intent_distribution']) == {'greeting', 'suicide', 'other'}
+        print(f"✓ Statistics export: {len(stats['intent_distribution'])} intent buckets")
+        return True
+    except Exception as e:
+        print(f"❌ Statistics export error: {e}")
+        return False
+
+
 def test_text_processing():
     """Test text preprocessing"""
     print("\nTesting text processing...")
@@ -175,6 +204,7 @@ def run_all_tests():
     results.append(("Data Loader", test_data_loader()))
     results.append(("Personas", test_personas()))
     results.append(("Privacy", test_privacy()))
+    results.append(("Statistics Export", test_statistics_export()))
     results.append(("Text Processing", test_text_processing()))
     results.append(("Video Recommendations", test_video_recommendations()))
     results.append(("Crisis Detection", test_crisis_detection()))
@@ -0,0 +1,191 @@
+"""
+Storage Module
+SQLite-backed stores for chat history metadata and questionnaire results
+"""
+
+import sqlite3
+import threading
+from typing import Dict, Iterable, List
+
+
+class HistoryIndex:
+    """
+    Per-session metadata for saved chat histories
+    
+    Keeps one row per session (message count, creation and last update
+    times) so listing histories is a single query instead of opening and
+    parsing every history file. Safe to call from worker threads.
+    """
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, "
+            "message_count INTEGER NOT NULL DEFAULT 0, "
+            "created_at TEXT, "
+            "last_updated TEXT)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS sessions_last_updated ON sessions (last_updated)"
+        )
+        self.conn.commit()
+    
+    def record_message(self, session_id: str, created_at: str, timestamp: str):
+        """
+        Count one new message for a session, adding the session if needed
+        
+        Args:
+            session_id: Session identifier
+            created_at: Session creation time (used only for new sessions)
+            timestamp: Time of the message
+        """
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO sessions (session_id, message_count, created_at, last_updated) "
+                "VALUES (?, 1, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET "
+                "message_count = message_count + 1, last_updated = excluded.last_updated",
+                (session_id, created_at, timestamp)
+            )
+            self.conn.commit()
+    
+    def add_sessions(self, summaries: Iterable[Dict]):
+        """
+        Insert or replace session summaries (e.g. when indexing existing files)
+        
+        Args:
+            summaries: Dicts with session_id, message_count, created_at and last_updated
+        """
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sessions (session_id, message_count, created_at, last_updated) "
+                "VALUES (:session_id, :message_count, :created_at, :last_updated)",
+                list(summaries)
+            )
+            self.conn.commit()
+    
+    def session_ids(self) -> set:
+        """Get the ids of all indexed sessions"""
+        with self.lock:
+            return {row[0] for row in self.conn.execute("SELECT session_id FROM sessions")}
+    
+    def list_sessions(self, limit: int = -1) -> List[Dict]:
+        """
+        Get session summaries, most recently updated first
+        
+        Args:
+            limit: Maximum number of sessions to return (-1 for all)
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT session_id, message_count, created_at, last_updated "
+                "FROM sessions ORDER BY last_updated DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        
+        return [
+            {
+                "session_id": session_id,
+                "message_count": message_count,
+                "created_at": created_at,
+                "last_updated": last_updated
+            }
+            for session_id, message_count, created_at, last_updated in rows
+        ]
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class QuestionnaireStore:
+    """
+    All questionnaire submissions in one SQLite table
+    
+    One row per submission (answers, scores and result), so saving is a
+    single insert and analysis is a query rather than a scan over per-
+    submission files. Safe to call from worker threads.
+    """
+    
+    COLUMNS = (
+        "session_id", "timestamp",
+        "work_environment", "stress_management", "selfcare_frequency",
+        "support_interest", "energy_level",
+        "work_environment_score", "stress_management_score", "selfcare_frequency_score",
+        "support_interest_score", "energy_level_score",
+        "total_score", "category", "interpretation"
+    )
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS questionnaire_results ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "session_id TEXT NOT NULL, "
+            "timestamp TEXT NOT NULL, "
+            "work_environment TEXT, "
+            "stress_management REAL, "
+            "selfcare_frequency TEXT, "
+            "support_interest TEXT, "
+            "energy_level REAL, "
+            "work_environment_score REAL, "
+            "stress_management_score REAL, "
+            "selfcare_frequency_score REAL, "
+            "support_interest_score REAL, "
+            "energy_level_score REAL, "
+            "total_score REAL, "
+            "category TEXT, "
+            "interpretation TEXT)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS questionnaire_results_session "
+            "ON questionnaire_results (session_id)"
+        )
+        self.conn.commit()
+    
+    def add_result(self, result: Dict):
+        """
+        Save one questionnaire result
+        
+        Args:
+            result: Dict with session_id, timestamp, answers, individual_scores,
+                total_score, category and interpretation
+        """
+        answers = result['answers']
+        scores = result['individual_scores']
+        row = (
+            result['session_id'], result['timestamp'],
+            answers.get('work_environment'), answers.get('stress_management'),
+            answers.get('selfcare_frequency'), answers.get('support_interest'),
+            answers.get('energy_level'),
+            scores['work_environment'], scores['stress_management'], scores['selfcare_frequency'],
+            scores['support_interest'], scores['energy_level'],
+            result['total_score'], result['category'], result['interpretation']
+        )
+        with self.lock:
+            self.conn.execute(
+                f"INSERT INTO questionnaire_results ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                row
+            )
+            self.conn.commit()
+    
+    def all_rows(self) -> List[tuple]:
+        """Get every submission as a tuple in COLUMNS order, oldest first"""
+        with self.lock:
+            return self.conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM questionnaire_results ORDER BY id"
+            ).fetchall()
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
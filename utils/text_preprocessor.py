@@ -29,6 +29,26 @@ from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 
 
+# Cleaning patterns, compiled once at import
+URL_PATTERN = re.compile(r'http\S+|www\S+|https\S+')
+EMAIL_PATTERN = re.compile(r'\S+@\S+')
+
+EMOTION_KEYWORDS = {
+    'sadness': ['sad', 'depressed', 'down', 'unhappy', 'miserable', 'lonely', 
+               'empty', 'hopeless', 'crying', 'tears'],
+    'anxiety': ['anxious', 'worried', 'nervous', 'scared', 'afraid', 'panic',
+               'stress', 'tense', 'overwhelmed', 'fear'],
+    'anger': ['angry', 'mad', 'furious', 'frustrated', 'irritated', 'annoyed',
+             'rage', 'hate'],
+    'joy': ['happy', 'joyful', 'glad', 'cheerful', 'excited', 'pleased',
+           'delighted', 'content'],
+    'worthlessness': ['worthless', 'useless', 'failure', 'inadequate', 'inferior',
+                    'pointless', 'meaningless'],
+    'suicidal': ['suicide', 'kill myself', 'end it', 'die', 'death wish',
+                'not worth living']
+}
+
+
 class TextPreprocessor:
     """Advanced text preprocessing for conversational AI"""
     
@@ -56,10 +76,10 @@ class TextPreprocessor:
         text = text.lower()
         
         # Remove URLs
-        text = re.sub(r'http\S+|www\S+|https\S+', '', text)
+        text = URL_PATTERN.sub('', text)
         
         # Remove email addresses
-        text = re.sub(r'\S+@\S+', '', text)
+        text = EMAIL_PATTERN.sub('', text)
         
         # Remove extra whitespace
         text = ' '.join(text.split())
@@ -123,23 +143,8 @@ class TextPreprocessor:
         """
         text = text.lower()
         
-        emotion_keywords = {
-            'sadness': ['sad', 'depressed', 'down', 'unhappy', 'miserable', 'lonely', 
-                       'empty', 'hopeless', 'crying', 'tears'],
-            'anxiety': ['anxious', 'worried', 'nervous', 'scared', 'afraid', 'panic',
-                       'stress', 'tense', 'overwhelmed', 'fear'],
-            'anger': ['angry', 'mad', 'furious', 'frustrated', 'irritated', 'annoyed',
-                     'rage', 'hate'],
-            'joy': ['happy', 'joyful', 'glad', 'cheerful', 'excited', 'pleased',
-                   'delighted', 'content'],
-            'worthlessness': ['worthless', 'useless', 'failure', 'inadequate', 'inferior',
-                            'pointless', 'meaningless'],
-            'suicidal': ['suicide', 'kill myself', 'end it', 'die', 'death wish',
-                        'not worth living']
-        }
-        
         detected = {}
-        for emotion, keywords in emotion_keywords.items():
+        for emotion, keywords in EMOTION_KEYWORDS.items():
             found = [kw for kw in keywords if kw in text]
             if found:
                 detected[emotion] = found